@@ -0,0 +1,45 @@
+"""
+Benchmark for applying aliases in draw_latex.
+Reports the time per cell for a growing number of cells and aliases, which should stay roughly constant.
+"""
+import string
+import timeit
+
+import latextable
+
+
+def run():
+    alias = _make_alias(40)
+    print('-- Alias: time per cell vs number of cells (40 aliases) --')
+    for n_rows in [100, 1000, 10000, 100000]:
+        _report(n_rows, 10, alias)
+    print('\n-- Alias: time per cell vs number of aliases (10000 rows) --')
+    for n_alias in [1, 10, 30, 60]:
+        _report(10000, 10, _make_alias(n_alias))
+
+
+def _make_alias(n_alias):
+    # A mix of single character escapes and longer substitutions
+    alias = {'&': '\\&', '%': '\\%', '_': '\\_', '#': '\\#', '+-': '$\\pm$'}
+    for i in range(n_alias - len(alias)):
+        alias['sym{:d}'.format(i)] = '$\\alpha_{{{:d}}}$'.format(i)
+    return dict(list(alias.items())[:n_alias])
+
+
+def _make_rows(n_rows, n_cols):
+    header = ['Col{:d}'.format(c) for c in range(n_cols)]
+    cell = '12 +- 3 & sym7 _ ' + string.ascii_lowercase
+    return [header] + [[cell] * n_cols for _ in range(n_rows)]
+
+
+def _report(n_rows, n_cols, alias):
+    rows = _make_rows(n_rows, n_cols)
+    apply_alias = latextable._compile_alias(tuple(alias.items()))
+    duration = min(timeit.repeat(lambda: [[apply_alias(c) for c in row] for row in rows], number=1, repeat=3))
+    n_cells = n_rows * n_cols
+    print('{:>8d} rows, {:>2d} aliases: {:8.3f} s total, {:6.3f} us per cell'.format(
+        n_rows, len(alias), duration, duration / n_cells * 1e6))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,37 @@
+"""
+Benchmark for escaping special Latex characters in draw_latex.
+Compares escape=True with escaping the same characters through aliases.
+"""
+import timeit
+
+import latextable
+
+ESCAPE_ALIAS = {'&': '\\&', '%': '\\%', '$': '\\$', '#': '\\#', '_': '\\_', '{': '\\{', '}': '\\}',
+                '~': '\\textasciitilde{}', '^': '\\textasciicircum{}', '\\': '\\textbackslash{}'}
+
+
+def run():
+    print('-- Escape: time per cell, escape=True vs aliases (10 columns) --')
+    for n_rows in [1000, 10000, 100000]:
+        rows = _make_rows(n_rows, 10)
+        _report('escape=True', rows, escape=True)
+        _report('alias', rows, alias=ESCAPE_ALIAS)
+        _report('escape=True + alias', rows, escape=True, alias={'+-': '$\\pm$'})
+
+
+def _make_rows(n_rows, n_cols):
+    header = ['Col_{:d}'.format(c) for c in range(n_cols)]
+    cell = '12 +- 3 & 50% of x_1 {a} #2'
+    return [header] + [[cell] * n_cols for _ in range(n_rows)]
+
+
+def _report(name, rows, **kwargs):
+    table = latextable.LatexTable.from_rows(rows)
+    duration = min(timeit.repeat(lambda: latextable.draw_latex(table, **kwargs), number=1, repeat=3))
+    n_cells = table.n_rows * table.n_columns
+    print('{:>8d} rows, {:<20s}: {:8.3f} s total, {:6.3f} us per cell'.format(
+        table.n_rows, name, duration, duration / n_cells * 1e6))
+
+
+if __name__ == "__main__":
+    run()
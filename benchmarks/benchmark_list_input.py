@@ -0,0 +1,45 @@
+"""
+Benchmark for drawing a list of rows, comparing the native LatexTable path against building a Texttable first.
+Reports the wall time and the peak memory (as measured by tracemalloc) of each path.
+"""
+import time
+import tracemalloc
+
+from texttable import Texttable
+
+import latextable
+
+
+def run():
+    print('-- List input: LatexTable vs Texttable --')
+    for n_rows in [1000, 10000, 100000]:
+        rows = _make_rows(n_rows, 8)
+        texttable_time, texttable_peak = _measure(lambda: latextable.draw_latex(_to_texttable(rows)))
+        native_time, native_peak = _measure(lambda: latextable.draw_latex(rows))
+        print('{:>7d} rows: Texttable {:7.3f} s {:8.1f} MB | LatexTable {:7.3f} s {:8.1f} MB | {:5.1f}x faster'.format(
+            n_rows, texttable_time, texttable_peak, native_time, native_peak, texttable_time / native_time))
+
+
+def _make_rows(n_rows, n_cols):
+    header = ['Col{:d}'.format(c) for c in range(n_cols)]
+    return [header] + [['r{:d}c{:d}'.format(r, c) for c in range(n_cols)] for r in range(n_rows)]
+
+
+def _to_texttable(rows):
+    table = Texttable()
+    table.add_rows(rows)
+    return table
+
+
+def _measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duration, peak / 2 ** 20
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,28 @@
+"""
+Benchmark for drawing many tables in parallel with draw_latex_many, from one worker up to the number of CPUs.
+"""
+import os
+import time
+
+import latextable
+
+
+def run():
+    header = ['Col{:d}'.format(c) for c in range(8)]
+    tables = [[header] + [['t{:d}r{:d}c{:d}'.format(t, r, c) for c in range(8)] for r in range(500)]
+              for t in range(400)]
+    options = {'use_booktabs': True, 'alias': {'_': '\\_'}, 'drop_columns': ['Col3']}
+    n_cpus = os.cpu_count() or 1
+    workers = sorted({1, 2, 4, 8, n_cpus} & set(range(1, n_cpus + 1)))
+    print('-- draw_latex_many: {:d} tables of {:d} rows --'.format(len(tables), len(tables[0]) - 1))
+    serial_time = None
+    for n_workers in workers:
+        start = time.perf_counter()
+        latextable.draw_latex_many(tables, options, workers=n_workers, chunksize=8)
+        duration = time.perf_counter() - start
+        serial_time = serial_time or duration
+        print('{:>3d} workers: {:7.3f} s | {:5.1f}x speedup'.format(n_workers, duration, serial_time / duration))
+
+
+if __name__ == "__main__":
+    run()
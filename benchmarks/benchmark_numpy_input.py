@@ -0,0 +1,37 @@
+"""
+Benchmark for drawing NumPy float matrices, comparing the vectorised column formatting of LatexTable.from_array
+against converting each value to a Python object and formatting it through Texttable.
+"""
+import time
+
+import numpy
+from texttable import Texttable
+
+import latextable
+
+
+def run():
+    print('-- NumPy input: vectorised column formatting vs Texttable --')
+    for n_rows in [1000, 10000, 100000]:
+        array = numpy.random.default_rng(0).normal(size=(n_rows, 10))
+        header = ['Col{:d}'.format(c) for c in range(array.shape[1])]
+        texttable_time = _measure(lambda: latextable.draw_latex(_to_texttable(header, array)))
+        array_time = _measure(lambda: latextable.draw_latex(latextable.LatexTable.from_array(array, header=header)))
+        print('{:>8d} cells: Texttable {:7.3f} s | LatexTable.from_array {:7.3f} s | {:5.1f}x faster'.format(
+            array.size, texttable_time, array_time, texttable_time / array_time))
+
+
+def _to_texttable(header, array):
+    table = Texttable()
+    table.add_rows([header] + array.tolist())
+    return table
+
+
+def _measure(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,33 @@
+"""
+Benchmark for drawing the rows of a single large table in parallel, from one worker up to the number of CPUs.
+"""
+import os
+import time
+
+import latextable
+
+
+def run():
+    n_rows = 500000
+    header = ['Sample', 'Loss', 'Accuracy', 'F1', 'Note']
+    rows = [['s{:d}'.format(r), '0.{:d}'.format(r), '0.9{:d}'.format(r), '0.8{:d}'.format(r), 'a_b & c']
+            for r in range(n_rows)]
+    table = latextable.LatexTable(header, rows)
+    options = {'alias': {'_': '\\_', '&': '\\&'}}
+    n_cpus = os.cpu_count() or 1
+    workers = sorted({1, 2, 4, 8, n_cpus} & set(range(1, n_cpus + 1)))
+    print('-- Parallel rows: one table of {:d} rows --'.format(n_rows))
+    expected = None
+    serial_time = None
+    for n_workers in workers:
+        start = time.perf_counter()
+        out = latextable.draw_latex(table, workers=n_workers, **options)
+        duration = time.perf_counter() - start
+        expected = expected or out
+        assert out == expected
+        serial_time = serial_time or duration
+        print('{:>3d} workers: {:7.3f} s | {:5.1f}x speedup'.format(n_workers, duration, serial_time / duration))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,136 @@
+"""
+Benchmark suite for draw_latex.
+Sweeps the number of rows, columns and aliases, the number of dropped columns and rows, selecting rows, and the
+booktabs and multicolumn header options, reporting the time and tracemalloc peak memory per cell for each.
+
+Run as a script to print the sweep (add --full to go up to a million rows). The ScalingTest cases check that time and
+memory grow linearly with the number of cells, failing if scaling is clearly super-linear. They are not collected with
+the unit tests, and can be run with:
+
+    python -m unittest discover -s benchmarks -p benchmark_suite.py
+"""
+import sys
+import time
+import tracemalloc
+import unittest
+
+import latextable
+
+# The cost per cell may grow by at most this factor over a sweep before scaling counts as super-linear
+MAX_SCALING_FACTOR = 3.0
+
+
+def run(full=False):
+    row_counts = [10, 100, 1000, 10000, 100000] + ([1000000] if full else [])
+    print('-- Rows (4 columns) --')
+    for n_rows in row_counts:
+        _report('{:>8d} rows'.format(n_rows), _make_rows(n_rows, 4))
+    print('\n-- Columns (10000 rows) --')
+    for n_cols in [1, 4, 16, 64]:
+        _report('{:>8d} columns'.format(n_cols), _make_rows(10000, n_cols))
+    print('\n-- Aliases (10000 rows, 4 columns) --')
+    rows = _make_rows(10000, 4)
+    for n_alias in [0, 1, 10, 30, 60]:
+        _report('{:>8d} aliases'.format(n_alias), rows, alias=_make_alias(n_alias))
+    print('\n-- Dropped columns (10000 rows, 64 columns) --')
+    rows = _make_rows(10000, 64)
+    for n_drop in [0, 1, 16, 48]:
+        _report('{:>8d} dropped'.format(n_drop), rows, drop_columns=rows[0][:n_drop])
+    print('\n-- Dropped rows (100000 rows, 4 columns) --')
+    rows = _make_rows(100000, 4)
+    for n_drop in [0, 10, 1000, 50000]:
+        _report('{:>8d} dropped'.format(n_drop), rows, drop_rows=list(range(0, 2 * n_drop, 2)))
+    print('\n-- Selected rows, keeping 10% (100000 rows, 4 columns) --')
+    rows = _make_rows(100000, 4)
+    _report('{:>16s}'.format('drop_rows'), rows, drop_rows=[r for r in range(100000) if r % 10])
+    _report('{:>16s}'.format('slice'), rows, rows=slice(0, None, 10))
+    _report('{:>16s}'.format('mask'), rows, rows=[r % 10 == 0 for r in range(100000)])
+    _report('{:>16s}'.format('predicate'), rows, rows=lambda row: row[0].endswith('0 +- c0 & x'))
+    print('\n-- Formatting (10000 rows, 4 columns) --')
+    rows = _make_rows(10000, 4)
+    _report('{:>16s}'.format('default'), rows)
+    _report('{:>16s}'.format('booktabs'), rows, use_booktabs=True)
+    _report('{:>16s}'.format('multicolumn'), rows, multicolumn_header=[('A', 2), ('B', 2)])
+
+
+def _make_rows(n_rows, n_cols):
+    header = ['Col{:d}'.format(c) for c in range(n_cols)]
+    return [header] + [['r{:d} +- c{:d} & x'.format(r, c) for c in range(n_cols)] for r in range(n_rows)]
+
+
+def _make_alias(n_alias):
+    alias = {'&': '\\&', '+-': '$\\pm$'}
+    for i in range(n_alias - len(alias)):
+        alias['sym{:d}'.format(i)] = '$\\alpha_{{{:d}}}$'.format(i)
+    return dict(list(alias.items())[:n_alias])
+
+
+def _measure(table_rows, **kwargs):
+    """
+    Measure drawing a table, returning the time and peak memory per cell (in microseconds and bytes).
+    The time is the best of a few runs without tracing, as tracemalloc slows down allocations.
+    """
+    table = latextable.LatexTable.from_rows(table_rows)
+    n_cells = max(1, table.n_rows * table.n_columns)
+    repeat = 3 if n_cells <= 10 ** 6 else 1
+    duration = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        latextable.draw_latex(table, **kwargs)
+        duration = min(duration, time.perf_counter() - start)
+    tracemalloc.start()
+    latextable.draw_latex(table, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duration / n_cells * 1e6, peak / n_cells
+
+
+def _report(name, table_rows, **kwargs):
+    time_per_cell, peak_per_cell = _measure(table_rows, **kwargs)
+    print('{:s}: {:7.3f} us per cell, {:7.1f} B peak per cell'.format(name, time_per_cell, peak_per_cell))
+
+
+class ScalingTest(unittest.TestCase):
+
+    def assert_linear(self, small, large):
+        """
+        Check that the time and memory per cell of the large case is not much more than that of the small case.
+        """
+        (small_time, small_peak), (large_time, large_peak) = small, large
+        self.assertLess(large_time, small_time * MAX_SCALING_FACTOR,
+                        "Time per cell grew from {:.3f} to {:.3f} us".format(small_time, large_time))
+        self.assertLess(large_peak, small_peak * MAX_SCALING_FACTOR,
+                        "Peak memory per cell grew from {:.1f} to {:.1f} B".format(small_peak, large_peak))
+
+    def test_rows(self):
+        self.assert_linear(_measure(_make_rows(1000, 4)), _measure(_make_rows(100000, 4)))
+
+    def test_columns(self):
+        self.assert_linear(_measure(_make_rows(10000, 4)), _measure(_make_rows(10000, 256)))
+
+    def test_aliases(self):
+        rows = _make_rows(10000, 4)
+        self.assert_linear(_measure(rows, alias=_make_alias(1)), _measure(rows, alias=_make_alias(60)))
+        self.assert_linear(_measure(_make_rows(1000, 4), alias=_make_alias(30)),
+                           _measure(_make_rows(100000, 4), alias=_make_alias(30)))
+
+    def test_drop_columns(self):
+        small = _make_rows(1000, 64)
+        large = _make_rows(100000, 64)
+        self.assert_linear(_measure(small, drop_columns=small[0][:48]), _measure(large, drop_columns=large[0][:48]))
+
+    def test_drop_rows(self):
+        self.assert_linear(_measure(_make_rows(1000, 4), drop_rows=list(range(0, 1000, 2))),
+                           _measure(_make_rows(100000, 4), drop_rows=list(range(0, 100000, 2))))
+
+    def test_select_rows(self):
+        self.assert_linear(_measure(_make_rows(1000, 4), rows=slice(0, None, 10)),
+                           _measure(_make_rows(100000, 4), rows=slice(0, None, 10)))
+
+    def test_booktabs_multicolumn(self):
+        options = dict(use_booktabs=True, multicolumn_header=[('A', 2), ('B', 2)])
+        self.assert_linear(_measure(_make_rows(1000, 4), **options), _measure(_make_rows(100000, 4), **options))
+
+
+if __name__ == "__main__":
+    run(full='--full' in sys.argv)
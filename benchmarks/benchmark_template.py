@@ -0,0 +1,34 @@
+"""
+Benchmark for drawing many small tables that share a layout, comparing LatexTemplate.render against draw_latex.
+"""
+import time
+
+import latextable
+
+
+def run():
+    header = ['Model', 'Seed', 'Accuracy', 'Loss', 'F1']
+    multicolumn_header = [('', 2), ('Metrics', 3)]
+    alias = {'+-': '$\\pm$', '_': '\\_'}
+    tables = [[['model_{:d}'.format(t), str(s), '0.9{:d} +- 0.01'.format(s), '0.1{:d}'.format(s), '0.8{:d}'.format(s)]
+               for s in range(5)] for t in range(40000)]
+
+    start = time.perf_counter()
+    for t, rows in enumerate(tables):
+        latextable.draw_latex([header] + rows, caption='Experiment {:d}.'.format(t), label='table:exp{:d}'.format(t),
+                              use_booktabs=True, multicolumn_header=multicolumn_header, alias=alias)
+    draw_latex_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    template = latextable.LatexTemplate(header, use_booktabs=True, multicolumn_header=multicolumn_header, alias=alias)
+    for t, rows in enumerate(tables):
+        template.render(rows, caption='Experiment {:d}.'.format(t), label='table:exp{:d}'.format(t))
+    template_time = time.perf_counter() - start
+
+    print('-- {:d} tables: draw_latex vs LatexTemplate --'.format(len(tables)))
+    print('draw_latex {:7.3f} s | LatexTemplate {:7.3f} s | {:5.1f}x faster'.format(
+        draw_latex_time, template_time, draw_latex_time / template_time))
+
+
+if __name__ == "__main__":
+    run()
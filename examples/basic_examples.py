@@ -16,6 +16,7 @@ def run():
     example_11()
     example_12()
     example_13()
+    example_14()
 
 
 def example_1():
@@ -216,5 +217,15 @@ def example_13():
     print(latextable.draw_latex(table_13, multicolumn_header=multicolumn_header))
 
 
+def example_14():
+    # Example 14 - Longtable
+    rows = [["Epoch", "Loss", "Accuracy"]] + [[str(e), "0.{:d}".format(99 - e), "0.{:d}".format(50 + e)]
+                                               for e in range(1, 6)]
+    print('\n-- Example 14: Longtable --')
+    print('Latextable Output:')
+    print(latextable.draw_latex(rows, caption="A table that can be broken across pages.", label="table:longtable",
+                                caption_above=True, use_booktabs=True, use_longtable=True))
+
+
 if __name__ == "__main__":
     run()
@@ -1,22 +1,40 @@
 """
 Drawing functions for outputting a Texttable table in a Latex format.
 """
-import texttable
+import collections
+import contextlib
+import contextvars
+import functools
+import io
+import itertools
+import operator
+import os
+import sys
+import threading
+import time
 
 
 def draw_latex(table, caption=None, caption_short=None, caption_above=False, label=None, drop_columns=None,
-               drop_rows=None, position=None, use_booktabs=False, multicolumn_header=None, alias=None):
+               drop_rows=None, position=None, use_booktabs=False, multicolumn_header=None, alias=None, plan=None,
+               workers=None, use_longtable=False, split_rows=None, escape=False, raw_columns=None, stats=None,
+               rows=None, merge_repeated=None, summary=None, highlight=None):
     """
     Draw a Texttable table in Latex format.
     Aside from table, all arguments are optional.
 
-    :param table: Texttable table to be rendered in Latex, or a list of rows that represents a table.
+    :param table: Texttable table or LatexTable to be rendered in Latex, or a list of rows that represents a table.
+            When given a list of rows, the first row is the header. Cells are formatted as per Texttable's automatic
+            data type, including strings that are numbers (e.g. "1.23456" is drawn as 1.235). To keep string cells
+            exactly as they are, pass a LatexTable created with auto_format=False.
+            A pandas DataFrame or 2-dimensional NumPy array can also be given (the first row of an array is the header).
+            These are formatted column by column, see LatexTable.from_dataframe and LatexTable.from_array.
+            Other types of table can be drawn by registering an adapter for them, see register_adapter.
     :param caption: A string that adds a caption to the Latex formatting.
     :param caption_short: A string that adds a short caption (used in the list of tables). Ignored if caption is None.
     :param caption_above: If True, the caption will be added above the table rather than below it (default).
     :param label: A string that adds a referencing label to the Latex formatting.
     :param drop_columns: A list of column names that won't be in the Latex output.
-            Each column name must be in the table header.
+            Each column name must be in the table header. Names are matched exactly if possible, otherwise ignoring case.
     :param drop_rows: A list of row indices that won't be in the Latex output.
             Each row index must be in [0, number of rows - 1], where number of rows does not include the header.
     :param position: A string that represents LaTex's float position of the table.
@@ -33,50 +51,1014 @@ def draw_latex(table, caption=None, caption_short=None, caption_above=False, lab
     :param alias: A str -> str dictionary denoting strings in the table data that should be aliased in the Latex output.
             Useful for escaping special Latex characters (e.g. &) or inserting custom Latex.
             For example, to replace '+-' with '$\\pm$', the dict would be {'+-': '$\\pm$'}.
+            Each cell is scanned once from left to right. At each position the longest matching key is replaced,
+            and the inserted text is not scanned again, so the order of the dict does not matter.
+    :param plan: A RenderPlan that has already resolved the columns and rows to drop.
+            Useful when drawing many tables with the same header. If given, drop_columns and drop_rows are ignored.
+    :param workers: Number of worker processes used to draw the table rows.
+            If greater than 1, the rows are split into chunks that are drawn in parallel and joined in order.
+            The output is identical to drawing in the current process (the default).
+    :param use_longtable: Whether to draw the table as a longtable (https://ctan.org/pkg/longtable?lang=en),
+            which can be broken across pages. The header is repeated on each page, with "(continued)" added to the
+            caption if it is above the table. The position is ignored.
+            Note the longtable package will need to be included in your Latex document (\\usepackage{longtable}).
+            Defaults to false.
+    :param split_rows: If given, the table is split into several tables of at most this many rows each, which all
+            repeat the header. Tables after the first have "(continued)" added to their caption and no label.
+            Ignored if use_longtable is true.
+    :param escape: Whether to escape the special Latex characters & % $ # _ { } ~ ^ and \\ in the header and cells.
+            Aliases are applied in the same pass and take priority, and the text they insert is not escaped.
+            Defaults to false.
+    :param raw_columns: A list of column names whose header and cells are not escaped, for columns that already
+            contain Latex. Each column name must be in the table header. Ignored if escape is false.
+    :param stats: A RenderStats that the statistics of drawing this table are added to, or a function that is called
+            with a RenderStats of this table once it is drawn. See also collect_stats.
+    :param rows: Selects the rows that are drawn, as one of:
+            a slice or range of row indices (e.g. slice(0, 100) or range(0, 1000, 10)),
+            a sequence or NumPy array of row indices,
+            a sequence or NumPy array of bools with one per row (e.g. a boolean mask),
+            or a function that is given each row (as a tuple of its formatted cells, before dropping columns) and
+            returns whether to draw it.
+            Rows are selected lazily as they are drawn, and are always drawn in table order.
+            Row indices are indices into the full table, and drop_rows is applied on top of the selection.
+            Ignored if plan is given.
+    :param merge_repeated: A list of column names whose repeated cells are merged. Each run of equal consecutive
+            cells in these columns is drawn as one \\multirow cell, and hlines are replaced by \\cline so they do not
+            cross the merged cells. A run is also broken wherever a run in a merged column to its left is broken.
+            Each column name must be in the table header. Dropped columns are ignored.
+            Note the multirow package will need to be included in your Latex document (\\usepackage{multirow}).
+    :param summary: Draws a summary of the rows rather than all of them, as one of:
+            ('headtail', k) for the first and last k rows, separated by a row of \\vdots if any rows are left out,
+            or ('topk', column, k) for the k rows with the largest numbers in a column, from largest to smallest.
+            Cells that are not numbers are ranked below all numbers, and ties are kept in table order.
+            The rows are read in one pass, holding at most k rows in memory. The summary is taken from the rows left
+            after selecting and dropping rows, and cannot be combined with split_rows or merge_repeated.
+    :param highlight: A dict from column names to 'max' or 'min', to highlight the best values of each column.
+            Cells with the best value (the largest for 'max', or the smallest for 'min') are drawn in \\textbf, and
+            cells with the second best value are drawn in \\underline. All cells that tie for a value are
+            highlighted, and cells that are not numbers are ignored. The best values are found among the rows left
+            after selecting and dropping rows. Each column name must be in the table header. Dropped columns are
+            ignored. As the best values must be known before the first row is drawn, a TableStream is read into
+            memory before drawing.
 
     :return: The formatted Latex table returned as a single string.
     """
-    # If passed a list of rows rather than a table, create the table first
-    if type(table) != texttable.Texttable:
-        rows = table
-        table = texttable.Texttable()
-        table.add_rows(rows)
-
-    # Sanitise inputs
-    _sanitise_drop_columns(table._header, drop_columns, multicolumn_header)
-    _sanitise_drop_rows(len(table._rows), drop_rows)
-
-    # Apply aliases
-    if alias is not None:
-        for s_src, s_dst in alias.items():
-            # Apply to header
-            table._header = [h.replace(s_src, s_dst) for h in table._header]
-            # Apply to rows
-            for r_idx, row in enumerate(table._rows):
-                # Apply to header
-                table._rows[r_idx] = [r.replace(s_src, s_dst) for r in table._rows[r_idx]]
-
-    # Create and return the latex output
-    out = ""
-    out += _draw_latex_preamble(table=table,
-                                position=position,
-                                caption=caption if caption_above else None,
-                                caption_short=caption_short if caption_above else None,
-                                use_booktabs=use_booktabs)
-    out += _draw_latex_header(table=table,
-                              drop_columns=drop_columns,
-                              use_booktabs=use_booktabs,
-                              multicolumn_header=multicolumn_header)
-    out += _draw_latex_content(table=table,
+    return "".join(_iter_latex(table=table,
+                               caption=caption,
+                               caption_short=caption_short,
+                               caption_above=caption_above,
+                               label=label,
                                drop_columns=drop_columns,
                                drop_rows=drop_rows,
+                               position=position,
+                               use_booktabs=use_booktabs,
+                               multicolumn_header=multicolumn_header,
+                               alias=alias,
+                               plan=plan,
+                               workers=workers,
+                               use_longtable=use_longtable,
+                               split_rows=split_rows,
+                               escape=escape,
+                               raw_columns=raw_columns,
+                               stats=stats,
+                               rows=rows,
+                               merge_repeated=merge_repeated,
+                               summary=summary,
+                               highlight=highlight))
+
+
+def iter_latex(table, **kwargs):
+    """
+    Lazily draw a Texttable table in Latex format, yielding the output piece by piece.
+    The table content is yielded one row at a time, so the full Latex string is never held in memory.
+    Joining the yielded strings gives exactly the output of draw_latex.
+
+    The inputs are checked when this function is called, rather than when the first piece is requested.
+
+    :param table: Texttable table or LatexTable to be rendered in Latex, or a list of rows that represents a table.
+    :param kwargs: Optional keyword arguments, as accepted by draw_latex.
+    :return: An iterator over the strings that make up the formatted Latex table.
+    """
+    return _iter_latex(table, **kwargs)
+
+
+def write_latex(table, fp, **kwargs):
+    """
+    Draw a Texttable table in Latex format, writing the output to a file-like object as it is generated.
+    The table content is written one row at a time, so the full Latex string is never held in memory.
+
+    :param table: Texttable table to be rendered in Latex, or a list of rows that represents a table.
+    :param fp: A file-like object with a write method that accepts strings (e.g. an open text file or io.StringIO).
+    :param kwargs: Optional keyword arguments, as accepted by draw_latex.
+    :return: None
+    """
+    write = fp.write
+    for text in _iter_latex(table, **kwargs):
+        write(text)
+
+
+def draw_formats(table, formats=("latex", "markdown", "html", "text"), **kwargs):
+    """
+    Draw a table in several formats at once, formatting and cleaning each cell only once. See write_formats.
+
+    :param table: Texttable table to be rendered, or anything else accepted by draw_latex.
+    :param formats: The names of the formats to draw: "latex", "markdown", "html" and/or "text".
+    :param kwargs: Optional keyword arguments, as accepted by draw_latex.
+    :return: A dict from each format name to the table drawn in that format as a single string.
+    """
+    files = {name: io.StringIO() for name in formats}
+    write_formats(table, files, **kwargs)
+    return {name: fp.getvalue() for name, fp in files.items()}
+
+
+def write_formats(table, files, **kwargs):
+    """
+    Draw a table in several formats at once, writing each to a file-like object as it is generated.
+
+    The table is converted, and its rows selected and cleaned, in a single pass that feeds every format, so drawing
+    N formats costs little more than drawing one. The formats are:
+
+    - latex: the same output as draw_latex.
+    - markdown: a GitHub flavoured Markdown table, with | escaped in cells.
+    - html: an HTML table, with a caption if given, and cells escaped.
+    - text: the same layout as Texttable.draw, with cells wrapped to fit the max width of a Texttable table (80
+      characters for other tables). As column widths depend on every row, the text rows are held in memory until the
+      end of the table.
+
+    The keyword arguments apply to every format, except that aliases, escaping and the Latex layout options only
+    apply to the latex format. Newlines are removed from cells in all formats. Rows are drawn in this process, so
+    workers is ignored.
+
+    :param table: Texttable table to be rendered, or anything else accepted by draw_latex.
+    :param files: A dict from each format name to a file-like object with a write method that accepts strings.
+    :param kwargs: Optional keyword arguments, as accepted by draw_latex.
+    :return: None
+    """
+    unknown = [name for name in files if name != "latex" and name not in _EMITTERS]
+    if unknown:
+        raise ValueError("Unknown formats {:s}, expected some of {:s}.".format(
+            str(unknown), str(["latex"] + list(_EMITTERS))))
+    max_width = getattr(table, "_max_width", 80)
+    table = _to_latex_table(table)
+    plan = kwargs.pop("plan", None)
+    if plan is None:
+        plan = RenderPlan(table.header, drop_columns=kwargs.pop("drop_columns", None),
+                          drop_rows=kwargs.pop("drop_rows", None), rows=kwargs.pop("rows", None))
+    kwargs["workers"] = None
+    if "latex" not in files:
+        # The Latex output is thrown away, so skip its cleaning
+        kwargs["alias"] = None
+        kwargs["escape"] = False
+    header = _clean_row(plan.project(table.header))
+    align = [table.align[c] for c in plan.columns]
+    sinks = [(_EMITTERS[name](header, align, table.deco, kwargs.get("caption"), max_width), fp)
+             for name, fp in files.items() if name != "latex"]
+    pieces = _iter_latex(table, plan=plan, sinks=sinks, **kwargs)
+    for emitter, fp in sinks:
+        fp.write(emitter.begin())
+    if "latex" in files:
+        write = files["latex"].write
+        for text in pieces:
+            write(text)
+    else:
+        collections.deque(pieces, maxlen=0)
+    for emitter, fp in sinks:
+        fp.write(emitter.end())
+
+
+def render_to_file(table, path, cache_dir=None, **kwargs):
+    """
+    Draw a table in Latex format and write it to a file, but only if the file contents would change.
+    Leaving unchanged files untouched keeps their modification times, so build tools (e.g. latexmk) don't rebuild.
+
+    If a cache directory is given, each output is also stored there under the fingerprint of its table and options.
+    When the same table is drawn with the same options again, the stored output is used instead of drawing it.
+    Tables drawn with a function as an option (e.g. a rows predicate), and TableStreams, are not stored in the cache
+    directory.
+    The cache directory is never cleaned automatically; it can safely be deleted at any time.
+
+    :param table: Texttable table to be rendered in Latex, or anything else accepted by draw_latex.
+    :param path: Path of the file to write.
+    :param cache_dir: Optional directory for the cache of drawn tables. Created if it doesn't exist.
+    :param kwargs: Optional keyword arguments, as accepted by draw_latex.
+    :return: True if the file was written, or False if it already had the same contents.
+    """
+    table = _to_latex_table(table)
+    data = None
+    cache_path = None
+    key = _fingerprint(table, kwargs) if cache_dir is not None else None
+    if key is not None:
+        cache_path = os.path.join(cache_dir, key + ".tex")
+        data = _read_file(cache_path)
+    if data is None:
+        data = draw_latex(table, **kwargs).encode("utf-8")
+        if cache_path is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            _write_file_atomic(cache_path, data)
+    if _read_file(path) == data:
+        return False
+    _write_file_atomic(path, data)
+    return True
+
+
+def _read_file(path):
+    """
+    Read the contents of a file, if it exists.
+
+    :param path: Path of the file to read.
+    :return: The file contents as bytes, or None if the file does not exist.
+    """
+    try:
+        with open(path, "rb") as fp:
+            return fp.read()
+    except FileNotFoundError:
+        return None
+
+
+def _write_file_atomic(path, data):
+    """
+    Write a file by writing a temporary file in the same directory and then renaming it, so a reader never sees
+    a partially written file. The file keeps the permissions of the file it replaces, or gets the permissions of a
+    newly created file (as per the umask) if there was none.
+
+    :param path: Path of the file to write.
+    :param data: The file contents as bytes.
+    :return: None
+    """
+    import stat
+    import tempfile
+
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(data)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def draw_latex_many(tables, options=None, workers=None, chunksize=1, paths=None):
+    """
+    Draw many tables in Latex format in parallel, using a pool of worker processes.
+    On Python builds without the global interpreter lock, threads are used instead of processes.
+
+    Each table is converted to a compact LatexTable before being sent to a worker, so Texttable objects are never
+    pickled. The results are returned in the same order as the tables.
+
+    :param tables: An iterable of tables, each of which can be anything accepted by draw_latex.
+    :param options: Optional keyword arguments for draw_latex. Either a single dict used for every table,
+            or a list of dicts with one per table.
+    :param workers: Number of worker processes (or threads). Defaults to the number of CPUs.
+            If 1, the tables are drawn one by one in the current process.
+    :param chunksize: Number of tables sent to a worker at a time. Larger chunks reduce the communication overhead
+            when drawing many small tables.
+    :param paths: Optional list of file paths, one per table. If given, each worker writes its table directly to the
+            file instead of returning it.
+    :return: A list with the formatted Latex of each table, or the list of paths if paths is given.
+    """
+    tables = [_to_latex_table(table) for table in tables]
+    if options is None or isinstance(options, dict):
+        options = [options or {}] * len(tables)
+    if paths is None:
+        paths = [None] * len(tables)
+    if not len(tables) == len(options) == len(paths):
+        raise ValueError("Got {:d} tables, {:d} options and {:d} paths - expected one of each per table.".format(
+            len(tables), len(options), len(paths)))
+    jobs = list(zip(tables, options, paths))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(jobs) <= 1:
+        return [_draw_latex_job(job) for job in jobs]
+    with _make_executor(workers) as executor:
+        return list(executor.map(_draw_latex_job, jobs, chunksize=chunksize))
+
+
+def _make_executor(workers):
+    """
+    Create a pool of workers for drawing tables in parallel.
+    Processes are used, unless the global interpreter lock is disabled, in which case threads are used instead.
+
+    :param workers: Number of workers.
+    :return: A concurrent.futures executor.
+    """
+    import concurrent.futures
+
+    if getattr(sys, "_is_gil_enabled", lambda: True)():
+        return concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+    return concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+
+
+def _draw_latex_job(job):
+    """
+    Draw a single table for draw_latex_many, either returning the output or writing it to a file.
+
+    :param job: A 3-tuple of the LatexTable, the draw_latex keyword arguments, and the output path (or None).
+    :return: The formatted Latex table, or the output path if one was given.
+    """
+    table, options, path = job
+    if path is None:
+        return draw_latex(table, **options)
+    with open(path, "w", encoding="utf-8") as fp:
+        write_latex(table, fp, **options)
+    return path
+
+
+async def adraw_latex(table, yield_every=1000, **kwargs):
+    """
+    Draw a table in Latex format without blocking the asyncio event loop for long.
+    Control is given back to the event loop after every yield_every lines of output. The output is identical to
+    draw_latex.
+
+    :param table: Anything accepted by draw_latex, or an async iterable of rows whose first row is the header
+            (read lazily as a TableStream).
+    :param yield_every: Number of lines of output drawn between giving control back to the event loop.
+    :param kwargs: Optional keyword arguments, as accepted by draw_latex.
+    :return: The formatted Latex table returned as a single string.
+    """
+    return "".join([piece async for piece in _aiter_latex(table, yield_every, kwargs)])
+
+
+async def awrite_latex(table, writer, yield_every=1000, **kwargs):
+    """
+    Draw a table in Latex format, writing the output to an async sink as it is generated.
+    Control is given back to the event loop after every yield_every lines of output, and whenever the sink is written.
+
+    The output is written in chunks of about 64 KB. If the sink has a drain method (e.g. an asyncio.StreamWriter),
+    each chunk is encoded as UTF-8, written, and then drained, so a slow reader slows down drawing rather than
+    output building up in memory. Otherwise, the sink's write method is awaited with each chunk as a string.
+
+    :param table: Anything accepted by adraw_latex, including an async iterable of rows.
+    :param writer: An asyncio.StreamWriter, or an object with a write coroutine method that accepts strings.
+    :param yield_every: Number of lines of output drawn between giving control back to the event loop.
+    :param kwargs: Optional keyword arguments, as accepted by draw_latex.
+    :return: None
+    """
+    if hasattr(writer, "drain"):
+        async def write(text):
+            writer.write(text.encode("utf-8"))
+            await writer.drain()
+    else:
+        write = writer.write
+    chunk = []
+    chunk_size = 0
+    async for piece in _aiter_latex(table, yield_every, kwargs):
+        chunk.append(piece)
+        chunk_size += len(piece)
+        if chunk_size >= 65536:
+            await write("".join(chunk))
+            chunk = []
+            chunk_size = 0
+    if chunk:
+        await write("".join(chunk))
+
+
+async def _aiter_latex(table, yield_every, kwargs):
+    """
+    Draw a table in Latex format, asynchronously yielding the output piece by piece.
+
+    The table is drawn by the same generator as draw_latex. Rows of an async iterable are read in batches into a
+    buffer that a TableStream draws from, and the buffer is refilled before it can run out. Drawing one piece reads
+    at most two rows ahead (or two chunks of split_rows rows), plus any dropped rows that are skipped. If rows are
+    selected with the rows argument, summarised or highlighted, all the rows are read before drawing.
+
+    :param table: Anything accepted by adraw_latex.
+    :param yield_every: Number of pieces drawn between giving control back to the event loop.
+    :param kwargs: Keyword arguments for draw_latex.
+    :return: An async generator over the strings that make up the formatted Latex table.
+    """
+    import asyncio
+
+    source = None
+    row_buffer = None
+    if hasattr(table, "__aiter__"):
+        source = table.__aiter__()
+        try:
+            header = await source.__anext__()
+        except StopAsyncIteration:
+            raise ValueError("The table is empty - expected a header row.")
+        row_buffer = _RowBuffer()
+        table = TableStream(header, row_buffer)
+    plan = kwargs.get("plan")
+    n_dropped = len(plan.dropped_rows) if plan is not None else len(set(kwargs.get("drop_rows") or ()))
+    lookahead = 2 * (kwargs.get("split_rows") or 1) + n_dropped
+    if ((plan.selection if plan is not None else kwargs.get("rows")) is not None
+            or kwargs.get("summary") is not None or kwargs.get("highlight")):
+        # Any number of rows may be skipped between the selected (or summarised) rows, and highlighting needs every
+        # row before drawing, so read all the rows first
+        lookahead = float("inf")
+        if row_buffer is not None:
+            await row_buffer.fill(source, lookahead)
+    pieces = _iter_latex(table, **kwargs)
+    n_pieces = 0
+    while True:
+        if row_buffer is not None and not row_buffer.exhausted and len(row_buffer.rows) < lookahead:
+            await row_buffer.fill(source, lookahead + yield_every)
+        piece = next(pieces, None)
+        if piece is None:
+            return
+        yield piece
+        n_pieces += 1
+        if n_pieces % yield_every == 0:
+            await asyncio.sleep(0)
+
+
+class _RowBuffer:
+    """
+    An iterator over rows that are read ahead from an async iterable. See _aiter_latex.
+    """
+
+    __slots__ = ("rows", "exhausted")
+
+    def __init__(self):
+        self.rows = collections.deque()
+        self.exhausted = False
+
+    async def fill(self, source, n_rows):
+        """
+        Read rows from an async iterator until the buffer holds n_rows rows, or the iterator is exhausted.
+
+        :param source: The async iterator to read from.
+        :param n_rows: Number of rows to fill the buffer to.
+        :return: None
+        """
+        rows = self.rows
+        while len(rows) < n_rows:
+            try:
+                rows.append(await source.__anext__())
+            except StopAsyncIteration:
+                self.exhausted = True
+                return
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.rows:
+            return self.rows.popleft()
+        if self.exhausted:
+            raise StopIteration
+        raise RuntimeError("The row buffer ran out before the end of the rows.")
+
+
+@contextlib.contextmanager
+def collect_stats():
+    """
+    Collect the statistics of every table drawn in a with block, added together into one RenderStats.
+    Collection follows the current context, so tables drawn by other threads are not included.
+    Blocks can be nested, in which case each table is added to every enclosing block.
+
+    Example::
+
+        with latextable.collect_stats() as stats:
+            for table in tables:
+                latextable.draw_latex(table)
+        print(stats.calls, stats.stage_times)
+
+    :return: A context manager that gives the RenderStats the statistics are added to.
+    """
+    stats = RenderStats()
+    token = _stats_collectors.set(_stats_collectors.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _stats_collectors.reset(token)
+
+
+def register_adapter(cls, adapter):
+    """
+    Register a function that converts objects of a type into a table for drawing, so that they can be passed
+    directly to draw_latex (and all the other drawing functions).
+
+    The type can be given as a "module.ClassName" string rather than the class itself, so its module doesn't need to be
+    imported to register it. This is how the built-in adapters for Texttable, pandas, NumPy and pyarrow are registered,
+    so none of them are imported by latextable until an object of their type is drawn.
+    Adapters also apply to subclasses. Adapters registered later take priority over earlier ones (and the built-in
+    adapters). The adapter of each type is looked up once, and then cached.
+
+    :param cls: The class, or its "module.ClassName" name.
+    :param adapter: A function that takes an object of the type and returns a LatexTable or TableStream.
+    :return: None
+    """
+    _adapters.append((cls, adapter))
+    _adapter_cache.clear()
+
+
+# The RenderStats of the enclosing collect_stats blocks
+_stats_collectors = contextvars.ContextVar("latextable_stats_collectors", default=())
+
+
+def main(argv=None):
+    """
+    Command line entry point (the latextable console script).
+    Reads a CSV, TSV or JSON lines file (or stdin), and writes it as a Latex table to a file (or stdout).
+    The input is streamed row by row, so memory use stays constant however large the input is.
+
+    :param argv: Optional list of command line arguments. Defaults to sys.argv[1:].
+    :return: The exit status: 0 on success, or 1 if the table could not be drawn.
+    """
+    import argparse
+    import csv
+
+    parser = argparse.ArgumentParser(prog="latextable", description="Draw a CSV, TSV or JSON lines table in Latex.")
+    parser.add_argument("input", nargs="?", default="-", help="input file, or - for stdin (the default)")
+    parser.add_argument("-o", "--output", default="-", help="output file, or - for stdout (the default)")
+    parser.add_argument("-f", "--format", choices=["csv", "tsv", "jsonl"],
+                        help="input format, by default guessed from the input file extension (otherwise csv)")
+    parser.add_argument("--caption", help="caption of the table")
+    parser.add_argument("--caption-short", help="short caption, used in the list of tables")
+    parser.add_argument("--caption-above", action="store_true", help="put the caption above the table")
+    parser.add_argument("--label", help="referencing label of the table")
+    parser.add_argument("--position", help="float position of the table, e.g. ht")
+    parser.add_argument("--align", help="column alignments, e.g. lrc, or a single alignment for every column")
+    parser.add_argument("--booktabs", action="store_true", help="use booktabs formatting")
+    parser.add_argument("--longtable", action="store_true", help="draw a longtable that can break across pages")
+    parser.add_argument("--drop-column", action="append", dest="drop_columns", metavar="NAME",
+                        help="drop a column (can be repeated)")
+    parser.add_argument("--alias", action="append", default=[], metavar="SRC=DST",
+                        help="replace SRC with DST in the table (can be repeated)")
+    parser.add_argument("--escape", action="store_true", help="escape special Latex characters")
+    parser.add_argument("--raw-column", action="append", dest="raw_columns", metavar="NAME",
+                        help="don't escape a column that already contains Latex (can be repeated)")
+    parser.add_argument("--progress", action="store_true", help="report progress and throughput on stderr")
+    args = parser.parse_args(argv)
+
+    alias = {}
+    for item in args.alias:
+        src, sep, dst = item.partition("=")
+        if not sep:
+            parser.error("argument --alias: expected SRC=DST, got {:s}".format(item))
+        alias[src] = dst
+    input_format = args.format
+    if input_format is None:
+        input_format = {".tsv": "tsv", ".jsonl": "jsonl", ".ndjson": "jsonl"}.get(
+            os.path.splitext(args.input)[1].lower(), "csv")
+
+    in_fp = None
+    out_fp = None
+    try:
+        in_fp = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="") if args.input == "-" else \
+            open(args.input, encoding="utf-8", newline="")
+        out_fp = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+        rows = _read_rows(in_fp, input_format)
+        try:
+            header = next(rows)
+        except StopIteration:
+            raise ValueError("The input is empty - expected a header row.")
+        if args.progress:
+            rows = _report_progress(rows, sys.stderr)
+        align = args.align
+        if align is not None and len(align) == 1:
+            align = align * len(header)
+        write_latex(TableStream(header, rows, align=align), out_fp, caption=args.caption,
+                    caption_short=args.caption_short, caption_above=args.caption_above, label=args.label,
+                    drop_columns=args.drop_columns, position=args.position, use_booktabs=args.booktabs,
+                    alias=alias, use_longtable=args.longtable, escape=args.escape, raw_columns=args.raw_columns)
+        out_fp.write("\n")
+    except (AlignError, DropColumnError, DropRowError, RawColumnError, RowSizeError, ValueError, csv.Error,
+            OSError) as error:
+        sys.stderr.write("latextable: error: {:s}\n".format(str(error).strip()))
+        return 1
+    finally:
+        if in_fp is not None:
+            # Detach rather than close stdin, so it stays usable by the caller
+            if args.input == "-":
+                in_fp.detach()
+            else:
+                in_fp.close()
+        if out_fp is sys.stdout:
+            out_fp.flush()
+        elif out_fp is not None:
+            out_fp.close()
+    return 0
+
+
+def _read_rows(fp, input_format):
+    """
+    Lazily read the rows of a table from a text file, starting with the header.
+
+    :param fp: The text file to read from.
+    :param input_format: 'csv', 'tsv' or 'jsonl'.
+            Each JSON line is either a list of cells (the first being the header), or an object mapping column names
+            to cells (the header being the keys of the first object).
+    :return: An iterator over the rows, each as a list of cells.
+    """
+    import csv
+
+    if input_format == "jsonl":
+        return _read_jsonl(fp)
+    return csv.reader(fp, dialect="excel-tab" if input_format == "tsv" else "excel")
+
+
+def _read_jsonl(fp):
+    """
+    Lazily read the rows of a table from a JSON lines file. See _read_rows.
+
+    :param fp: The text file to read from.
+    :return: A generator over the rows, each as a list of cells.
+    """
+    import json
+
+    header = None
+    for line_num, line in enumerate(fp, 1):
+        if not line.strip():
+            continue
+        row = json.loads(line)
+        if isinstance(row, dict):
+            if header is None:
+                header = list(row)
+                yield header
+            row = [row.get(name) for name in header]
+        elif not isinstance(row, list):
+            raise ValueError("Line {:d} is not a JSON array or object.".format(line_num))
+        yield ["" if cell is None else cell for cell in row]
+
+
+def _report_progress(rows, fp, interval=1.0):
+    """
+    Pass rows through unchanged, writing the number of rows read and the throughput to a file at regular intervals.
+
+    :param rows: An iterable over rows.
+    :param fp: The text file to report to (e.g. stderr).
+    :param interval: Minimum number of seconds between reports.
+    :return: A generator over the same rows.
+    """
+    start = last_report = time.perf_counter()
+    n_rows = 0
+    for n_rows, row in enumerate(rows, 1):
+        yield row
+        now = time.perf_counter()
+        if now - last_report >= interval:
+            fp.write("\r{:d} rows ({:.0f} rows/s)".format(n_rows, n_rows / (now - start)))
+            fp.flush()
+            last_report = now
+    duration = time.perf_counter() - start
+    fp.write("\r{:d} rows in {:.2f} s ({:.0f} rows/s)\n".format(n_rows, duration, n_rows / max(duration, 1e-9)))
+
+
+def _iter_latex(table, caption=None, caption_short=None, caption_above=False, label=None, drop_columns=None,
+                drop_rows=None, position=None, use_booktabs=False, multicolumn_header=None, alias=None, plan=None,
+                workers=None, use_longtable=False, split_rows=None, escape=False, raw_columns=None, stats=None,
+                rows=None, merge_repeated=None, summary=None, highlight=None, sinks=None):
+    """
+    Prepare and check a table for drawing, then return a generator over its Latex output.
+    See draw_latex for a description of the other arguments.
+
+    :param sinks: Optional list of (emitter, file) pairs that each drawn row is also written to, see write_formats.
+
+    :return: A generator over the strings that make up the formatted Latex table.
+    """
+    # Statistics are only recorded if requested, so drawing without them has no extra cost
+    stats_targets = _stats_collectors.get()
+    if stats is not None:
+        stats_targets += (stats,)
+    call_stats = RenderStats() if stats_targets else None
+    if call_stats is not None:
+        start = time.perf_counter()
+
+    table = _to_latex_table(table)
+    if call_stats is not None:
+        call_stats.stage_times["convert"] += time.perf_counter() - start
+        start = time.perf_counter()
+
+    # Highlighting needs every row before the first is drawn, so read a stream into memory
+    if highlight and table.n_rows is None:
+        table = LatexTable.from_rows([table.header] + list(table.rows()), align=table.align, deco=table.deco,
+                                     auto_format=False)
+
+    # Sanitise inputs, resolving the dropped columns and rows once for the whole table
+    if plan is None:
+        plan = RenderPlan(table.header, drop_columns=drop_columns, drop_rows=drop_rows, rows=rows)
+    plan.check(table.header, table.n_rows)
+    _sanitise_multicolumn_header(len(plan.columns), multicolumn_header)
+
+    if split_rows is not None and split_rows < 1:
+        raise ValueError("split_rows must be at least 1, got {:d}.".format(split_rows))
+
+    # Compile aliases and escaping (applied to each cell as it is drawn, so the table itself is never modified)
+    cleaner = _make_cell_cleaner(table.header, plan, alias, escape, raw_columns)
+    if sinks:
+        cleaner = _TeeCellCleaner(cleaner, sinks)
+    if highlight:
+        cleaner = _HighlightCellCleaner(cleaner, _find_highlights(table, plan, highlight))
+    merge = _resolve_merge_columns(table.header, plan, merge_repeated)
+    summary = _resolve_summary(table.header, plan, summary)
+    if summary is not None and (split_rows is not None or merge):
+        raise SummaryError("a summary cannot be combined with split_rows or merge_repeated")
+
+    if call_stats is not None:
+        call_stats.stage_times["prepare"] += time.perf_counter() - start
+        call_stats.calls = 1
+        call_stats.columns_dropped = table.n_columns - len(plan.columns)
+        call_stats.rows_dropped = len(plan.dropped_rows)
+        cleaner = _TimedCellCleaner(cleaner or _CellCleaner(), call_stats, alias)
+    pieces = _generate(table=table,
+                       caption=caption,
+                       caption_short=caption_short,
+                       caption_above=caption_above,
+                       label=label,
+                       plan=plan,
+                       position=position,
+                       use_booktabs=use_booktabs,
+                       multicolumn_header=multicolumn_header,
+                       cleaner=cleaner,
+                       workers=workers,
+                       use_longtable=use_longtable,
+                       split_rows=split_rows,
+                       merge=merge,
+                       summary=summary)
+    if table.n_rows is None:
+        pieces = _iter_then_check_rows(pieces, table, plan)
+    if call_stats is not None:
+        return _iter_with_stats(pieces, call_stats, stats_targets, table, plan, summary is None)
+    return pieces
+
+
+def _iter_then_check_rows(pieces, table, plan):
+    """
+    Yield the Latex output of a TableStream, then check the dropped rows once the number of rows is known.
+
+    :param pieces: A generator over the strings that make up the formatted Latex table.
+    :param table: TableStream being drawn.
+    :param plan: RenderPlan describing the rows to drop.
+    :return: A generator over the same strings as pieces.
+    """
+    yield from pieces
+    plan.check(table.header, table.n_rows)
+
+
+def _generate(table, caption, caption_short, caption_above, label, plan, position, use_booktabs, multicolumn_header,
+              cleaner, workers, use_longtable, split_rows, merge=None, summary=None):
+    """
+    Choose how to draw a prepared table: as a longtable, split into several tables, or as a single table.
+
+    :return: A generator over the strings that make up the formatted Latex table.
+    """
+    if use_longtable:
+        return _generate_longtable(table=table,
+                                   caption=caption,
+                                   caption_short=caption_short,
+                                   caption_above=caption_above,
+                                   label=label,
+                                   plan=plan,
+                                   use_booktabs=use_booktabs,
+                                   multicolumn_header=multicolumn_header,
+                                   cleaner=cleaner,
+                                   workers=workers,
+                                   merge=merge,
+                                   summary=summary)
+    if split_rows is not None:
+        return _generate_split_tables(table=table,
+                                      caption=caption,
+                                      caption_short=caption_short,
+                                      caption_above=caption_above,
+                                      label=label,
+                                      plan=plan,
+                                      position=position,
+                                      use_booktabs=use_booktabs,
+                                      multicolumn_header=multicolumn_header,
+                                      cleaner=cleaner,
+                                      split_rows=split_rows,
+                                      merge=merge)
+    return _generate_latex(table=table,
+                           caption=caption,
+                           caption_short=caption_short,
+                           caption_above=caption_above,
+                           label=label,
+                           plan=plan,
+                           position=position,
+                           use_booktabs=use_booktabs,
+                           multicolumn_header=multicolumn_header,
+                           cleaner=cleaner,
+                           workers=workers,
+                           merge=merge,
+                           summary=summary)
+
+
+def _to_latex_table(table):
+    """
+    Convert any supported table input to a LatexTable (or TableStream), using the adapter registered for its type.
+    A list of rows is used directly, without creating a Texttable.
+
+    :param table: Texttable table, LatexTable, TableStream, list of rows, or an object with a registered adapter
+            (e.g. a pandas DataFrame, NumPy array or pyarrow Table).
+    :return: The table as a LatexTable or TableStream.
+    """
+    table_type = type(table)
+    if table_type is LatexTable or table_type is TableStream:
+        return table
+    try:
+        adapter = _adapter_cache[table_type]
+    except KeyError:
+        adapter = _find_adapter(table_type)
+    if adapter is not None:
+        return adapter(table)
+    return LatexTable.from_rows(table)
+
+
+def _find_adapter(table_type):
+    """
+    Find the adapter for a type, caching the result (including when there is no adapter).
+    Adapters registered by name only match once their module has been imported, which it must have been for an
+    object of the type to exist. Later registrations take priority.
+
+    :param table_type: The type of the table to draw.
+    :return: The adapter function, or None if there is no adapter for the type.
+    """
+    adapter = None
+    for cls, candidate in reversed(_adapters):
+        if isinstance(cls, str):
+            module_name, _, class_name = cls.rpartition(".")
+            cls = getattr(sys.modules.get(module_name), class_name, None)
+        if isinstance(cls, type) and issubclass(table_type, cls):
+            adapter = candidate
+            break
+    _adapter_cache[table_type] = adapter
+    return adapter
+
+
+def _generate_latex(table, caption, caption_short, caption_above, label, plan, position, use_booktabs,
+                    multicolumn_header, cleaner, workers=None, merge=None, summary=None):
+    """
+    Generate the Latex output for a prepared table, one piece at a time.
+    The preamble and header are yielded first, then each row of the content, and finally the postamble.
+    The table is only read, never modified, so the same table can be drawn by several threads at once.
+
+    :return: A generator over the strings that make up the formatted Latex table.
+    """
+    yield _draw_latex_preamble(table=table,
+                               position=position,
+                               caption=caption if caption_above else None,
+                               caption_short=caption_short if caption_above else None,
                                use_booktabs=use_booktabs)
-    out += _draw_latex_postamble(table=table,
-                                 caption=caption if not caption_above else None,
-                                 caption_short=caption_short if not caption_above else None,
-                                 label=label,
-                                 use_booktabs=use_booktabs)
-    return out
+    yield _draw_latex_header(table=table,
+                             plan=plan,
+                             use_booktabs=use_booktabs,
+                             multicolumn_header=multicolumn_header,
+                             cleaner=cleaner)
+    yield from _iter_latex_content(table=table,
+                                   plan=plan,
+                                   use_booktabs=use_booktabs,
+                                   cleaner=cleaner,
+                                   workers=workers,
+                                   merge=merge,
+                                   summary=summary)
+    yield _draw_latex_postamble(table=table,
+                                caption=caption if not caption_above else None,
+                                caption_short=caption_short if not caption_above else None,
+                                label=label,
+                                use_booktabs=use_booktabs)
+
+
+def _generate_longtable(table, caption, caption_short, caption_above, label, plan, use_booktabs, multicolumn_header,
+                        cleaner, workers=None, merge=None, summary=None):
+    """
+    Generate the Latex output for a prepared table as a longtable, one piece at a time.
+    The header is repeated at the top of each page, and the bottom rule at the bottom of each page.
+    The rows are drawn in the same way as for a normal table.
+
+    Example Output::
+
+        \\begin{longtable}{|l|r|}
+            \\caption{An example table.}\\label{table:example_table} \\\\
+            \\hline
+            Name & Age \\\\
+            \\hline
+            \\endfirsthead
+            \\caption[]{An example table. (continued)} \\\\
+            \\hline
+            Name & Age \\\\
+            \\hline
+            \\endhead
+            \\hline
+            \\endfoot
+            \\hline
+            \\endlastfoot
+            Xavier & 32 \\\\
+        \\end{longtable}
+
+    :return: A generator over the strings that make up the formatted Latex longtable.
+    """
+    header = _draw_latex_header(table=table,
+                                plan=plan,
+                                use_booktabs=use_booktabs,
+                                multicolumn_header=multicolumn_header,
+                                cleaner=cleaner,
+                                indent=1)
+    caption_str = _draw_longtable_caption(caption, caption_short, label)
+    yield "\\begin{longtable}" + _draw_column_spec(table, use_booktabs) + "\n"
+    # Header on the first page (with the caption if it is above the table, or the label if there is no caption),
+    # then the header repeated on every following page
+    if caption is not None and caption_above:
+        yield caption_str + header + _indent_text("\\endfirsthead\n", 1)
+        yield _draw_longtable_caption(caption + " (continued)", "", None)
+    elif caption is None and label is not None:
+        yield _label_first_row(header, label) + _indent_text("\\endfirsthead\n", 1)
+    yield header
+    yield _indent_text("\\endhead\n", 1)
+    # Bottom rule on every page, with the caption after it on the last page if it is below the table
+    bottom_rule = _draw_bottom_rule(table, use_booktabs, indent=1)
+    if bottom_rule:
+        yield bottom_rule + _indent_text("\\endfoot\n", 1)
+    last_foot = bottom_rule + (caption_str if not caption_above and caption is not None else "")
+    if last_foot:
+        yield last_foot + _indent_text("\\endlastfoot\n", 1)
+    yield from _iter_latex_content(table=table,
+                                   plan=plan,
+                                   use_booktabs=use_booktabs,
+                                   cleaner=cleaner,
+                                   workers=workers,
+                                   merge=merge,
+                                   summary=summary,
+                                   indent=1)
+    yield "\\end{longtable}"
+
+
+def _draw_longtable_caption(caption, caption_short, label):
+    """
+    Draw a longtable caption and label, which take up a row of the longtable.
+
+    :param caption: The main caption for the table. If None, nothing is drawn (see _label_first_row).
+    :param caption_short: The short version of the caption. An empty string stops the caption being listed.
+    :param label: A label to add to the table.
+    :return: The caption row as one string, which is empty if there is no caption.
+    """
+    if caption is None:
+        return ""
+    out = "\\caption"
+    if caption_short is not None:
+        out += "[" + caption_short + "]"
+    out += "{" + caption + "}"
+    if label is not None:
+        out += "\\label{" + label + "}"
+    return _indent_text(out + " \\\\\n", 1)
+
+
+def _label_first_row(header, label):
+    """
+    Add a label to the end of the first row of a drawn longtable header, for a longtable without a caption.
+    A label on a row of its own would add an empty row to the table, and one at the start of the row would break
+    a multicolumn header.
+
+    :param header: The drawn header, as returned by _draw_latex_header.
+    :param label: The label to add.
+    :return: The header with the label added.
+    """
+    lines = header.split("\n")
+    row_idx = 1 if lines[0].strip() in ("\\hline", "\\toprule") else 0
+    row_end = " \\\\"
+    lines[row_idx] = lines[row_idx][:-len(row_end)] + "\\label{" + label + "}" + row_end
+    return "\n".join(lines)
+
+
+def _generate_split_tables(table, caption, caption_short, caption_above, label, plan, position, use_booktabs,
+                           multicolumn_header, cleaner, split_rows, merge=None):
+    """
+    Generate the Latex output for a prepared table split into several tables, one piece at a time.
+    Each table has at most split_rows rows and repeats the header. Only one chunk of rows is held in memory at once.
+
+    :return: A generator over the strings that make up the formatted Latex tables.
+    """
+    head = _draw_tabular_begin(table, use_booktabs) + _draw_latex_header(table=table,
+                                                                         plan=plan,
+                                                                         use_booktabs=use_booktabs,
+                                                                         multicolumn_header=multicolumn_header,
+                                                                         cleaner=cleaner)
+    tabular_end = _draw_tabular_end(table, use_booktabs)
+    use_hlines = table.has_hlines() and not use_booktabs
+    rows = plan.select_rows(table)
+    chunk = list(itertools.islice(rows, split_rows))
+    first = True
+    while True:
+        next_chunk = list(itertools.islice(rows, split_rows))
+        chunk_caption = caption if first or caption is None else caption + " (continued)"
+        chunk_caption_str = _draw_table_caption(chunk_caption, caption_short if first else None)
+        yield _draw_table_begin(position)
+        if caption_above:
+            yield chunk_caption_str
+        yield head
+        if merge:
+            yield from _iter_latex_merged_rows(chunk, merge, len(plan.columns), use_hlines, cleaner)
+        else:
+            yield from _iter_latex_rows(chunk, len(chunk) - 1, use_hlines, cleaner)
+        yield tabular_end
+        if not caption_above:
+            yield chunk_caption_str
+        if first and label is not None:
+            yield _indent_text("\\label{" + label + "}\n", 1)
+        yield "\\end{table}"
+        if not next_chunk:
+            break
+        yield "\n"
+        chunk = next_chunk
+        first = False
 
 
 class DropColumnError(Exception):
@@ -88,6 +1070,36 @@ class DropColumnError(Exception):
         super().__init__("Cannot drop column {:s} - column not in table header ({:s})\n".format(column, str(header)))
 
 
+class RawColumnError(Exception):
+    """
+    Error thrown when a column that should not be escaped does not exist in the table header.
+    """
+
+    def __init__(self, column, header):
+        super().__init__("Cannot leave column {:s} unescaped - column not in table header ({:s})\n".format(
+            column, str(header)))
+
+
+class MergeColumnError(Exception):
+    """
+    Error thrown when a column whose repeated cells should be merged does not exist in the table header.
+    """
+
+    def __init__(self, column, header):
+        super().__init__("Cannot merge column {:s} - column not in table header ({:s})\n".format(
+            column, str(header)))
+
+
+class HighlightColumnError(Exception):
+    """
+    Error thrown when a column whose best values should be highlighted does not exist in the table header.
+    """
+
+    def __init__(self, column, header):
+        super().__init__("Cannot highlight column {:s} - column not in table header ({:s})\n".format(
+            column, str(header)))
+
+
 class MulticolumnHeaderError(Exception):
     """
     Error thrown when there is a mismatch between multicolumns and actual columns (after dropping columns).
@@ -107,6 +1119,1387 @@ class DropRowError(Exception):
         super().__init__("Cannot drop row {:d} - row is outside the range [1,{:d}]\n".format(row_idx, n_rows))
 
 
+class RowSelectionError(Exception):
+    """
+    Error thrown when the rows to draw cannot be selected from the table.
+    """
+
+    def __init__(self, reason):
+        super().__init__("Cannot select rows - {:s}\n".format(reason))
+
+
+class SummaryError(Exception):
+    """
+    Error thrown when a summary of the rows to draw is not valid.
+    """
+
+    def __init__(self, reason):
+        super().__init__("Cannot summarise rows - {:s}\n".format(reason))
+
+
+class RenderPlanError(Exception):
+    """
+    Error thrown when a render plan is used with a table whose header does not match the plan.
+    """
+
+    def __init__(self, plan_header, header):
+        super().__init__("Render plan was created for header {:s} but the table header is {:s}\n".format(
+            str(list(plan_header)), str(list(header))))
+
+
+class RowSizeError(Exception):
+    """
+    Error thrown when a row does not have the same number of cells as the table header.
+    """
+
+    def __init__(self, n_columns, row_size):
+        super().__init__("Row has {:d} cells but the table has {:d} columns.\n".format(row_size, n_columns))
+
+
+class ColumnSizeError(Exception):
+    """
+    Error thrown when the columns of a table do not all have the same number of cells.
+    """
+
+    def __init__(self, n_rows, column_size):
+        super().__init__("Column has {:d} cells but the table has {:d} rows.\n".format(column_size, n_rows))
+
+
+class AlignError(Exception):
+    """
+    Error thrown when the column alignments do not match the table header, or are not all 'l', 'c' or 'r'.
+    """
+
+    def __init__(self, n_columns, align):
+        if len(align) != n_columns:
+            message = "Got {:d} column alignments but the table has {:d} columns.".format(len(align), n_columns)
+        else:
+            message = "Column alignments must be 'l', 'c' or 'r', got {:s}.".format(str(list(align)))
+        super().__init__(message + "\n")
+
+
+def _check_align(align, n_columns):
+    """
+    Check the column alignments of a table, defaulting to left alignment for every column.
+
+    :param align: Optional list of column alignments.
+    :param n_columns: The number of columns in the table.
+    :return: The column alignments as a list.
+    """
+    if align is None:
+        return ["l"] * n_columns
+    align = list(align)
+    if len(align) != n_columns or any(a not in ("l", "c", "r") for a in align):
+        raise AlignError(n_columns, align)
+    return align
+
+
+class LatexTable:
+    """
+    A lightweight table model that is drawn directly in Latex.
+
+    The data is stored column by column as tuples of strings, along with the column alignment and decoration flags.
+    Unlike Texttable, no cell widths or wrapping are computed, so lists of rows can be drawn without that overhead.
+    Texttable tables are converted to this model before drawing, and it can also be passed directly to draw_latex.
+    The decoration flags have the same values as their Texttable equivalents.
+    """
+
+    BORDER = 1
+    HEADER = 1 << 1
+    HLINES = 1 << 2
+    VLINES = 1 << 3
+
+    __slots__ = ("header", "columns", "align", "deco", "n_rows")
+
+    def __init__(self, header, rows=(), align=None, deco=BORDER | HEADER | HLINES | VLINES, auto_format=True):
+        """
+        Create a table from a header and rows of cells.
+        Cells are formatted in the same way as Texttable's automatic data type, including strings that are numbers
+        (e.g. "1.23456" is drawn as 1.235), unless auto_format is False.
+
+        :param header: A list of column names.
+        :param rows: An iterable of rows, each with one cell per column.
+        :param align: A list of column alignments ('l', 'c' or 'r'). Defaults to left alignment for every column.
+        :param deco: Decoration flags, a combination of LatexTable.BORDER, HEADER, HLINES and VLINES.
+                Defaults to all of them (as per texttable).
+        :param auto_format: Whether to format numbers as per Texttable's automatic data type. If False, string cells
+                are kept exactly as they are, and other cells are converted with str.
+        """
+        self.header = [_format_cell(h, auto=False) for h in header]
+        n_columns = len(self.header)
+        columns = [[] for _ in range(n_columns)]
+        appends = [column.append for column in columns]
+        for row in rows:
+            if len(row) != n_columns:
+                raise RowSizeError(n_columns, len(row))
+            for append, cell in zip(appends, row):
+                append(_format_cell(cell, auto_format))
+        self.columns = tuple(tuple(column) for column in columns)
+        self.n_rows = len(self.columns[0]) if columns else 0
+        self.align = _check_align(align, n_columns)
+        self.deco = deco
+
+    @classmethod
+    def from_rows(cls, rows, align=None, deco=BORDER | HEADER | HLINES | VLINES, auto_format=True):
+        """
+        Create a table from a list of rows, where the first row is the header.
+
+        :param rows: An iterable of rows. The first row is used as the table header.
+        :param align: A list of column alignments ('l', 'c' or 'r'). Defaults to left alignment for every column.
+        :param deco: Decoration flags. Defaults to all of them.
+        :param auto_format: Whether to format numbers as per Texttable's automatic data type, see __init__.
+        :return: The new LatexTable.
+        """
+        rows = iter(rows)
+        return cls(next(rows), rows, align=align, deco=deco, auto_format=auto_format)
+
+    @classmethod
+    def from_texttable(cls, table):
+        """
+        Create a table from a Texttable table, keeping its alignment and decoration.
+        The Texttable table is not modified.
+
+        :param table: Texttable table to convert.
+        :return: The new LatexTable.
+        """
+        n_columns = table._row_size or 0
+        columns = tuple(zip(*table._rows)) if table._rows else ((),) * n_columns
+        # A table whose rows were all added with header=False has no header, so draw an empty one
+        header = table._header or [""] * n_columns
+        return cls.from_columns(header, columns, align=getattr(table, "_align", None), deco=table._deco)
+
+    @classmethod
+    def from_columns(cls, header, columns, align=None, deco=BORDER | HEADER | HLINES | VLINES):
+        """
+        Create a table from columns of cells that are already formatted as strings.
+
+        :param header: A list of column names.
+        :param columns: A list of columns, each a sequence of strings. All columns must have the same length.
+        :param align: A list of column alignments ('l', 'c' or 'r'). Defaults to left alignment for every column.
+        :param deco: Decoration flags. Defaults to all of them.
+        :return: The new LatexTable.
+        """
+        self = cls.__new__(cls)
+        self.header = [_format_cell(h, auto=False) for h in header]
+        self.columns = tuple(columns)
+        if len(self.columns) != len(self.header):
+            raise RowSizeError(len(self.header), len(self.columns))
+        self.n_rows = len(self.columns[0]) if self.columns else 0
+        for column in self.columns:
+            if len(column) != self.n_rows:
+                raise ColumnSizeError(self.n_rows, len(column))
+        self.align = _check_align(align, len(self.header))
+        self.deco = deco
+        return self
+
+    @classmethod
+    def from_array(cls, array, header=None, precision=3, scientific=False, thousands=False, align=None,
+                   deco=BORDER | HEADER | HLINES | VLINES):
+        """
+        Create a table from a 2-dimensional NumPy array (or anything that can be converted to one).
+        Numeric columns are formatted in one vectorised call per column, rather than one cell at a time.
+
+        :param array: The table data, with one row per table row.
+        :param header: A list of column names. Defaults to the column indices.
+        :param precision: Number of decimal places for float columns, or a dict of column name -> precision.
+        :param scientific: Whether to use scientific notation for float columns, or a dict of column name -> bool.
+        :param thousands: Whether to add thousands separators to numeric columns, or a dict of column name -> bool.
+        :param align: A list of column alignments ('l', 'c' or 'r'). Defaults to left alignment for every column.
+        :param deco: Decoration flags. Defaults to all of them.
+        :return: The new LatexTable.
+        """
+        import numpy
+
+        array = numpy.asarray(array)
+        if array.ndim != 2:
+            raise ValueError("Expected a 2-dimensional array but got {:d} dimensions.".format(array.ndim))
+        if header is None:
+            header = [str(c) for c in range(array.shape[1])]
+        columns = [_format_column(array[:, c], _column_option(precision, name, 3),
+                                  _column_option(scientific, name, False), _column_option(thousands, name, False))
+                   for c, name in enumerate(header)]
+        return cls.from_columns(header, columns, align=align, deco=deco)
+
+    @classmethod
+    def from_dataframe(cls, df, index=False, precision=3, scientific=False, thousands=False, align=None,
+                       deco=BORDER | HEADER | HLINES | VLINES):
+        """
+        Create a table from a pandas DataFrame, using the column names as the header.
+        Numeric columns are formatted in one vectorised call per column, rather than one cell at a time.
+        Missing values in columns with a nullable data type (e.g. Int64 or boolean) are left empty.
+
+        :param df: The DataFrame to convert.
+        :param index: Whether to include the index as the first column.
+        :param precision: Number of decimal places for float columns, or a dict of column name -> precision.
+        :param scientific: Whether to use scientific notation for float columns, or a dict of column name -> bool.
+        :param thousands: Whether to add thousands separators to numeric columns, or a dict of column name -> bool.
+        :param align: A list of column alignments ('l', 'c' or 'r'). Defaults to left alignment for every column.
+        :param deco: Decoration flags. Defaults to all of them.
+        :return: The new LatexTable.
+        """
+        header = []
+        columns = []
+        if index:
+            header.append("" if df.index.name is None else df.index.name)
+            columns.append(df.index)
+        header.extend(df.columns)
+        columns.extend(df[name] for name in df.columns)
+        columns = [_format_pandas_column(column, _column_option(precision, name, 3),
+                                         _column_option(scientific, name, False),
+                                         _column_option(thousands, name, False))
+                   for name, column in zip(header, columns)]
+        return cls.from_columns(header, columns, align=align, deco=deco)
+
+    @classmethod
+    def from_arrow(cls, table, precision=3, scientific=False, thousands=False, align=None,
+                   deco=BORDER | HEADER | HLINES | VLINES):
+        """
+        Create a table from a pyarrow Table or RecordBatch, using the field names as the header.
+        Columns are formatted one Arrow chunk at a time, see TableStream.from_arrow. Null cells are left empty.
+
+        :param table: The pyarrow Table or RecordBatch to convert.
+        :param precision: Number of decimal places for float columns, or a dict of column name -> precision.
+        :param scientific: Whether to use scientific notation for float columns, or a dict of column name -> bool.
+        :param thousands: Whether to add thousands separators to numeric columns, or a dict of column name -> bool.
+        :param align: A list of column alignments ('l', 'c' or 'r'). Defaults to left alignment for every column.
+        :param deco: Decoration flags. Defaults to all of them.
+        :return: The new LatexTable.
+        """
+        header = table.schema.names
+        columns = []
+        for name, column in zip(header, table.columns):
+            options = (_column_option(precision, name, 3), _column_option(scientific, name, False),
+                       _column_option(thousands, name, False))
+            chunks = getattr(column, "chunks", [column])
+            columns.append([cell for chunk in chunks for cell in _format_arrow_column(chunk, *options)])
+        return cls.from_columns(header, columns, align=align, deco=deco)
+
+    @property
+    def n_columns(self):
+        """
+        The number of columns in the table.
+        """
+        return len(self.header)
+
+    def rows(self, columns=None):
+        """
+        Iterate over the rows of the table.
+
+        :param columns: Optional indices of the columns to include in each row. Defaults to all columns.
+        :return: An iterator over the rows, each given as a tuple of cells.
+        """
+        if columns is None:
+            return zip(*self.columns)
+        return zip(*[self.columns[c] for c in columns])
+
+    def has_border(self):
+        """
+        :return: True if the table has a border.
+        """
+        return self.deco & LatexTable.BORDER > 0
+
+    def has_header(self):
+        """
+        :return: True if the table has a line below the header.
+        """
+        return self.deco & LatexTable.HEADER > 0
+
+    def has_hlines(self):
+        """
+        :return: True if the table has horizontal lines between rows.
+        """
+        return self.deco & LatexTable.HLINES > 0
+
+    def has_vlines(self):
+        """
+        :return: True if the table has vertical lines between columns.
+        """
+        return self.deco & LatexTable.VLINES > 0
+
+
+class TableStream:
+    """
+    A table whose rows are read lazily from an iterable, so tables that don't fit in memory can be drawn.
+
+    Only the header is held in memory. The rows are read one at a time as the table is drawn, so a stream can only be
+    drawn once, and its number of rows (n_rows) is None until then. Rows that are dropped are still read, and any
+    dropped rows beyond the end of the table raise a DropRowError once the whole stream has been drawn.
+    Streams are always drawn in the current process, and can't be used with draw_latex_many, RenderCache or
+    IncrementalRenderer.
+    """
+
+    __slots__ = ("header", "align", "deco", "n_rows", "_rows", "_auto_format")
+
+    def __init__(self, header, rows, align=None, deco=LatexTable.BORDER | LatexTable.HEADER | LatexTable.HLINES |
+                 LatexTable.VLINES, auto_format=True):
+        """
+        Create a stream from a header and an iterable of rows.
+        Cells are formatted in the same way as Texttable's automatic data type, including strings that are numbers,
+        unless auto_format is False.
+
+        :param header: A list of column names.
+        :param rows: An iterable of rows, each with one cell per column. It is only iterated once.
+        :param align: A list of column alignments ('l', 'c' or 'r'). Defaults to left alignment for every column.
+        :param deco: Decoration flags, a combination of LatexTable.BORDER, HEADER, HLINES and VLINES.
+                Defaults to all of them (as per texttable).
+        :param auto_format: Whether to format numbers as per Texttable's automatic data type. If False, string cells
+                are kept exactly as they are, and other cells are converted with str.
+        """
+        self.header = [_format_cell(h, auto=False) for h in header]
+        self.align = _check_align(align, len(self.header))
+        self.deco = deco
+        self.n_rows = None
+        self._rows = iter(rows)
+        self._auto_format = auto_format
+
+    @classmethod
+    def from_rows(cls, rows, align=None, deco=LatexTable.BORDER | LatexTable.HEADER | LatexTable.HLINES |
+                  LatexTable.VLINES, auto_format=True):
+        """
+        Create a stream from an iterable of rows, where the first row is the header.
+
+        :param rows: An iterable of rows. The first row is read as the header.
+        :param align: A list of column alignments ('l', 'c' or 'r'). Defaults to left alignment for every column.
+        :param deco: Decoration flags. Defaults to all of them.
+        :param auto_format: Whether to format numbers as per Texttable's automatic data type, see __init__.
+        :return: The new TableStream.
+        """
+        rows = iter(rows)
+        return cls(next(rows), rows, align=align, deco=deco, auto_format=auto_format)
+
+    @classmethod
+    def from_arrow(cls, source, precision=3, scientific=False, thousands=False, align=None,
+                   deco=LatexTable.BORDER | LatexTable.HEADER | LatexTable.HLINES | LatexTable.VLINES):
+        """
+        Create a stream that draws Arrow data one record batch at a time, using the field names as the header.
+        Only one batch is formatted and held as Python strings at once, so tables larger than memory can be drawn from
+        a memory-mapped IPC file, e.g. pyarrow.ipc.open_file(pyarrow.memory_map(path)).
+
+        Integer columns are formatted with Arrow's cast kernel (unless using thousands separators), and float
+        columns with one vectorised call per batch (as for LatexTable.from_array). Null cells are left empty.
+
+        :param source: A pyarrow Table, an IPC file or stream reader, or an iterable of RecordBatches.
+        :param precision: Number of decimal places for float columns, or a dict of column name -> precision.
+        :param scientific: Whether to use scientific notation for float columns, or a dict of column name -> bool.
+        :param thousands: Whether to add thousands separators to numeric columns, or a dict of column name -> bool.
+        :param align: A list of column alignments ('l', 'c' or 'r'). Defaults to left alignment for every column.
+        :param deco: Decoration flags. Defaults to all of them.
+        :return: The new TableStream.
+        """
+        if hasattr(source, "to_batches"):
+            batches = iter(source.to_batches())
+            schema = source.schema
+        elif hasattr(source, "num_record_batches"):
+            batches = (source.get_batch(b) for b in range(source.num_record_batches))
+            schema = source.schema
+        elif hasattr(source, "schema"):
+            batches = iter(source)
+            schema = source.schema
+        else:
+            batches = iter(source)
+            first = next(batches)
+            batches = itertools.chain([first], batches)
+            schema = first.schema
+        header = schema.names
+        options = [(_column_option(precision, name, 3), _column_option(scientific, name, False),
+                    _column_option(thousands, name, False)) for name in header]
+        return cls(header, _iter_arrow_rows(batches, options), align=align, deco=deco, auto_format=False)
+
+    @property
+    def n_columns(self):
+        """
+        The number of columns in the table.
+        """
+        return len(self.header)
+
+    def rows(self, columns=None):
+        """
+        Read the rows of the stream. Once all the rows have been read, n_rows is set.
+
+        :param columns: Optional indices of the columns to include in each row. Defaults to all columns.
+        :return: An iterator over the rows, each given as a tuple of cells.
+        """
+        n_columns = len(self.header)
+        if columns is not None and list(columns) == list(range(n_columns)):
+            columns = None
+        auto_format = self._auto_format
+        n_rows = 0
+        for row in self._rows:
+            if len(row) != n_columns:
+                raise RowSizeError(n_columns, len(row))
+            row = tuple(_format_cell(cell, auto_format) for cell in row)
+            yield row if columns is None else tuple(row[c] for c in columns)
+            n_rows += 1
+        self.n_rows = n_rows
+
+    has_border = LatexTable.has_border
+    has_header = LatexTable.has_header
+    has_hlines = LatexTable.has_hlines
+    has_vlines = LatexTable.has_vlines
+
+
+def _adapt_array(array):
+    """
+    Convert a 2-dimensional NumPy array whose first row is the header to a LatexTable.
+    """
+    return LatexTable.from_array(array[1:], header=array[0])
+
+
+# Registered input adapters as (class or "module.ClassName", adapter) pairs, and the adapter found for each type
+_adapters = [
+    ("texttable.Texttable", LatexTable.from_texttable),
+    ("pandas.DataFrame", LatexTable.from_dataframe),
+    ("numpy.ndarray", _adapt_array),
+    ("pyarrow.Table", LatexTable.from_arrow),
+    ("pyarrow.RecordBatch", LatexTable.from_arrow),
+    ("pyarrow.RecordBatchReader", TableStream.from_arrow),
+    ("pyarrow.ipc.RecordBatchFileReader", TableStream.from_arrow),
+]
+_adapter_cache = {}
+
+
+class RenderPlan:
+    """
+    The columns and rows of a table that are drawn, resolved once from the columns and rows to drop and select.
+
+    Column names are resolved to indices, and row indices are stored in a set, so the checks take constant time.
+    Rows are selected lazily as the table is drawn, without copying them. A plan only depends on the table header,
+    so the same plan can be reused to draw many tables that share a header.
+    """
+
+    __slots__ = ("header", "columns", "dropped_rows", "selection", "project", "_min_row", "_max_row")
+
+    def __init__(self, header, drop_columns=None, drop_rows=None, rows=None):
+        """
+        Resolve the columns and rows to drop for tables with the given header.
+
+        :param header: The table header.
+        :param drop_columns: A list of column names to drop. Each column name must be in the header.
+                Names are matched exactly if possible, otherwise ignoring case.
+        :param drop_rows: A list of row indices to drop. Checked against the number of rows when drawing a table.
+        :param rows: Optional selection of the rows to draw, see draw_latex.
+        """
+        self.header = tuple(header)
+        dropped_columns = _resolve_drop_columns(self.header, drop_columns)
+        self.columns = tuple(c for c in range(len(self.header)) if c not in dropped_columns)
+        self.dropped_rows = frozenset(drop_rows) if drop_rows else frozenset()
+        self.selection = _RowSelection(rows) if rows is not None else None
+        self._min_row = min(self.dropped_rows) if self.dropped_rows else 0
+        self._max_row = max(self.dropped_rows) if self.dropped_rows else -1
+        # Precompute the projection from a full row to the drawn cells
+        if not dropped_columns:
+            self.project = tuple
+        elif len(self.columns) == 1:
+            column = self.columns[0]
+            self.project = lambda row: (row[column],)
+        elif not self.columns:
+            self.project = lambda row: ()
+        else:
+            self.project = operator.itemgetter(*self.columns)
+
+    def __reduce__(self):
+        """
+        Pickle the plan by its header and the dropped columns and rows, so it can be sent to worker processes.
+        """
+        drop_columns = [self.header[c] for c in range(len(self.header)) if c not in self.columns]
+        selector = self.selection.selector if self.selection is not None else None
+        return RenderPlan, (self.header, drop_columns, sorted(self.dropped_rows), selector)
+
+    def check(self, header, n_rows):
+        """
+        Check that the plan can be used to draw a table.
+
+        :param header: The table header, which must match the header the plan was created for.
+        :param n_rows: The number of rows in the table (excluding the header), or None if it is not known yet,
+                in which case the dropped rows are not checked.
+        :return: None
+        """
+        if len(header) != len(self.header) or tuple(header) != self.header:
+            raise RenderPlanError(self.header, header)
+        if n_rows is not None and (self._min_row < 0 or self._max_row >= n_rows):
+            _sanitise_drop_rows(n_rows, self.dropped_rows)
+        if self.selection is not None:
+            self.selection.check(n_rows)
+
+    def row_mask(self, n_rows):
+        """
+        Compute which rows are drawn, from the selected rows and the dropped rows (but not a row predicate).
+
+        :param n_rows: The number of rows in the table, or None if it is not known.
+        :return: A bytearray with a 1 for each row that is drawn, or None if every row is drawn or n_rows is None.
+        """
+        if n_rows is None or (not self.dropped_rows and (self.selection is None or not self.selection.has_mask)):
+            return None
+        if self.selection is not None and self.selection.has_mask:
+            mask = self.selection.mask(n_rows)
+        else:
+            mask = bytearray(b"\x01") * n_rows
+        for r_idx in self.dropped_rows:
+            mask[r_idx] = 0
+        return mask
+
+    def count_rows(self, n_rows, mask=None):
+        """
+        Count the rows that are drawn, if that can be done without reading them.
+
+        :param n_rows: The number of rows in the table, or None if it is not known.
+        :param mask: The row mask of the table, if already computed.
+        :return: The number of rows that are drawn, or None if it is not known.
+        """
+        if n_rows is None or (self.selection is not None and self.selection.predicate is not None):
+            return None
+        if mask is None:
+            mask = self.row_mask(n_rows)
+        return n_rows if mask is None else mask.count(1)
+
+    def select_rows(self, table, mask=None):
+        """
+        Lazily select the rows that are drawn, and the cells of each row that are drawn.
+        Rows are read once from the table, and never copied.
+
+        :param table: The LatexTable or TableStream being drawn.
+        :param mask: The row mask of the table, if already computed.
+        :return: An iterator over the rows that are drawn, each a tuple of the cells that are drawn.
+        """
+        selection = self.selection
+        predicate = selection.predicate if selection is not None else None
+        # A predicate is given the full row, so the row is only projected after it
+        rows = table.rows() if predicate is not None else table.rows(self.columns)
+        if mask is None:
+            mask = self.row_mask(table.n_rows)
+        if mask is not None:
+            rows = itertools.compress(rows, mask)
+        elif table.n_rows is None and (self.dropped_rows or (selection is not None and selection.has_mask)):
+            # Rows and dropped rows are both selected by their index in the table, so compute one flag per row
+            flags = selection.stream_flags() if selection is not None and selection.has_mask else itertools.repeat(True)
+            if self.dropped_rows:
+                dropped_rows = self.dropped_rows
+                flags = (flag and r_idx not in dropped_rows for r_idx, flag in enumerate(flags))
+            # Read each flag before its row, so no row is read from the stream after the last flag
+            rows = (row for flag, row in zip(flags, rows) if flag)
+        if predicate is not None:
+            rows = map(self.project, filter(predicate, rows))
+        return rows
+
+
+class _RowSelection:
+    """
+    A compiled selection of rows, from the rows argument of draw_latex.
+    Index selections (slices, ranges, row indices and booleans) become a mask over the rows of a table, which selects
+    the rows in a single pass with itertools.compress. A predicate filters the rows as they are read.
+    """
+
+    __slots__ = ("selector", "predicate", "_slice", "_indices", "_bools")
+
+    def __init__(self, selector):
+        """
+        :param selector: A slice, range, sequence (or array) of row indices, sequence (or array) of bools with one
+                per row, or a function that takes a row and returns whether to draw it.
+        """
+        self.selector = selector
+        self.predicate = self._slice = self._indices = self._bools = None
+        if isinstance(selector, slice):
+            self._slice = selector
+        elif isinstance(selector, range):
+            # A range selects the same rows as the equivalent slice
+            self._slice = slice(selector.start, selector.stop, selector.step)
+        elif callable(selector):
+            self.predicate = selector
+        elif hasattr(selector, "__array__"):
+            # NumPy arrays and pandas Series
+            import numpy
+
+            array = numpy.asarray(selector)
+            if array.dtype.kind == "b":
+                self._bools = bytes(numpy.asarray(array, dtype=bool).ravel())
+            elif array.dtype.kind in "iu":
+                self._indices = array.ravel().tolist()
+            else:
+                raise RowSelectionError("rows must be a slice, range, row indices, bools or a function")
+        else:
+            values = list(selector)
+            is_bool = [_is_bool(v) for v in values]
+            if values and all(is_bool):
+                self._bools = bytes(bool(v) for v in values)
+            elif not any(is_bool):
+                try:
+                    self._indices = [operator.index(v) for v in values]
+                except TypeError:
+                    raise RowSelectionError("rows must be a slice, range, row indices, bools or a function") from None
+            else:
+                raise RowSelectionError("rows cannot mix row indices and bools")
+        if self._slice is not None and self._slice.step is not None and self._slice.step <= 0:
+            raise RowSelectionError("slices must have a positive step, as rows are drawn in order")
+
+    @property
+    def has_mask(self):
+        return self.predicate is None
+
+    def check(self, n_rows):
+        """
+        Check the selection can be used to draw a table.
+
+        :param n_rows: The number of rows in the table, or None if it is not known yet.
+        :return: None
+        """
+        if n_rows is None:
+            if (self._slice is not None and any(v is not None and v < 0 for v in (self._slice.start, self._slice.stop))
+                    or self._indices and min(self._indices) < 0):
+                raise RowSelectionError("negative row indices need the number of rows to be known")
+            return
+        if self._bools is not None and len(self._bools) != n_rows:
+            raise RowSelectionError("got {:d} bools for {:d} rows".format(len(self._bools), n_rows))
+        if self._indices and not -n_rows <= min(self._indices) <= max(self._indices) < n_rows:
+            raise RowSelectionError("row indices must be in the range [{:d},{:d}]".format(-n_rows, n_rows - 1))
+
+    def mask(self, n_rows):
+        """
+        :param n_rows: The number of rows in the table.
+        :return: A bytearray with a 1 for each selected row.
+        """
+        if self._bools is not None:
+            return bytearray(self._bools)
+        mask = bytearray(n_rows)
+        if self._slice is not None:
+            mask[self._slice] = b"\x01" * len(range(n_rows)[self._slice])
+        else:
+            for r_idx in self._indices:
+                mask[r_idx] = 1
+        return mask
+
+    def stream_flags(self):
+        """
+        Lazily compute which rows are selected from a table whose number of rows is not known.
+
+        :return: An iterator with a bool for each row up to the last row that can be selected.
+        """
+        if self._bools is not None:
+            return iter(self._bools)
+        if self._indices is not None:
+            indices = frozenset(self._indices)
+            return (r_idx in indices for r_idx in range(max(indices) + 1 if indices else 0))
+        start, step = self._slice.start or 0, self._slice.step or 1
+        flags = (r_idx >= start and (r_idx - start) % step == 0 for r_idx in itertools.count())
+        return flags if self._slice.stop is None else itertools.islice(flags, self._slice.stop)
+
+
+def _is_bool(value):
+    """
+    :param value: A value from a rows selection.
+    :return: True if the value is a bool, including NumPy bools.
+    """
+    return type(value) is bool or getattr(getattr(value, "dtype", None), "kind", None) == "b"
+
+
+class LatexTemplate:
+    """
+    A precompiled Latex table layout for drawing many tables that share a header and formatting.
+
+    Everything that does not depend on the table rows (the preamble, header, and postamble, as well as the column
+    selection and aliases) is drawn once when the template is created. Rendering a table then only draws its rows
+    and fills in the caption and label.
+    """
+
+    def __init__(self, header, align=None, deco=LatexTable.BORDER | LatexTable.HEADER | LatexTable.HLINES |
+                 LatexTable.VLINES, caption_above=False, drop_columns=None, position=None, use_booktabs=False,
+                 multicolumn_header=None, alias=None, escape=False, raw_columns=None):
+        """
+        Create a template. See draw_latex for a description of the arguments.
+
+        :param header: The header shared by all tables drawn with the template.
+        :param align: A list of column alignments ('l', 'c' or 'r'). Defaults to left alignment for every column.
+        :param deco: Decoration flags, a combination of LatexTable.BORDER, HEADER, HLINES and VLINES.
+        """
+        table = LatexTable(header, align=align, deco=deco)
+        self._n_columns = len(table.header)
+        self._plan = RenderPlan(table.header, drop_columns=drop_columns)
+        _sanitise_multicolumn_header(len(self._plan.columns), multicolumn_header)
+        self._cleaner = _make_cell_cleaner(table.header, self._plan, alias, escape, raw_columns)
+        self._caption_above = caption_above
+        self._use_hlines = table.has_hlines() and not use_booktabs
+        self._table_begin = _draw_table_begin(position)
+        self._head = (_draw_tabular_begin(table, use_booktabs)
+                      + _draw_latex_header(table=table,
+                                           plan=self._plan,
+                                           use_booktabs=use_booktabs,
+                                           multicolumn_header=multicolumn_header,
+                                           cleaner=self._cleaner))
+        self._tabular_end = _draw_tabular_end(table, use_booktabs)
+
+    def render(self, rows, caption=None, caption_short=None, label=None):
+        """
+        Draw a table with the template.
+
+        :param rows: A sequence of rows (not including the header), each with one cell per column of the header.
+                As with draw_latex, cells are formatted as per Texttable's automatic data type, including strings
+                that are numbers (e.g. "1.23456" is drawn as 1.235).
+        :param caption: A string that adds a caption to the Latex formatting.
+        :param caption_short: A string that adds a short caption (used in the list of tables).
+        :param label: A string that adds a referencing label to the Latex formatting.
+        :return: The formatted Latex table returned as a single string.
+        """
+        content = _iter_latex_rows(rows=self._format_rows(rows),
+                                   last_idx=len(rows) - 1,
+                                   use_hlines=self._use_hlines,
+                                   cleaner=self._cleaner)
+        return self._assemble(content, caption, caption_short, label)
+
+    def _format_rows(self, rows):
+        """
+        Lazily select the drawn columns of each row and format their cells, checking the size of each row.
+
+        :param rows: An iterable of rows, each with one cell per column of the header.
+        :return: A generator of the formatted rows.
+        """
+        n_columns = self._n_columns
+        project = self._plan.project
+        for row in rows:
+            if len(row) != n_columns:
+                raise RowSizeError(n_columns, len(row))
+            yield [_format_cell(c) for c in project(row)]
+
+    def _select_rows(self, table):
+        """
+        Select the drawn columns of each row of a table with the template's header.
+
+        :param table: LatexTable to select the rows of.
+        :return: An iterator over the rows, each as a tuple of the drawn cells.
+        """
+        return table.rows(self._plan.columns)
+
+    def _draw_row(self, row):
+        """
+        Clean and draw a single row, as selected by _select_rows.
+
+        :param row: The drawn cells of the row.
+        :return: The drawn line of the row.
+        """
+        return next(_iter_latex_rows([row], 0, False, self._cleaner))
+
+    def _draw_lines(self, lines, caption, caption_short, label):
+        """
+        Draw a table from the drawn lines of its rows, as returned by _draw_row, adding hlines between them if needed.
+
+        :param lines: A list of the drawn lines of the rows.
+        :param caption: A string that adds a caption to the Latex formatting.
+        :param caption_short: A string that adds a short caption (used in the list of tables).
+        :param label: A string that adds a referencing label to the Latex formatting.
+        :return: The formatted Latex table returned as a single string.
+        """
+        if self._use_hlines:
+            lines = [_indent_text("\\hline\n", 3).join(lines)]
+        return self._assemble(lines, caption, caption_short, label)
+
+    def _assemble(self, content, caption, caption_short, label):
+        """
+        Join the drawn table content with the precomputed parts of the template.
+
+        :param content: An iterable over the drawn lines of the table content.
+        :param caption: A string that adds a caption to the Latex formatting.
+        :param caption_short: A string that adds a short caption (used in the list of tables).
+        :param label: A string that adds a referencing label to the Latex formatting.
+        :return: The formatted Latex table returned as a single string.
+        """
+        caption_str = _draw_table_caption(caption, caption_short)
+        out = [self._table_begin]
+        if self._caption_above:
+            out.append(caption_str)
+        out.append(self._head)
+        out.extend(content)
+        out.append(self._tabular_end)
+        if not self._caption_above:
+            out.append(caption_str)
+        if label is not None:
+            out.append(_indent_text("\\label{" + label + "}\n", 1))
+        out.append("\\end{table}")
+        return "".join(out)
+
+
+class IncrementalRenderer:
+    """
+    Draws a table that changes over time, only redrawing the rows that are new or have changed.
+
+    The drawn line of each row is cached, keyed by the cells of the row. When the table is drawn again, rows with
+    the same cells reuse their cached line, so the cost of each update is proportional to the number of new or
+    changed rows. The preamble, header and postamble are also cached until the header, alignment or decoration of
+    the table changes. Lines of rows that are no longer in the table are discarded.
+    The total number of rows that have been drawn (rather than taken from the cache) is kept in rows_drawn.
+    """
+
+    def __init__(self, caption_above=False, drop_columns=None, position=None, use_booktabs=False,
+                 multicolumn_header=None, alias=None, escape=False, raw_columns=None):
+        """
+        Create a renderer. See draw_latex for a description of the arguments.
+        """
+        self._options = dict(caption_above=caption_above, drop_columns=drop_columns, position=position,
+                             use_booktabs=use_booktabs, multicolumn_header=multicolumn_header, alias=alias,
+                             escape=escape, raw_columns=raw_columns)
+        self._layout = None
+        self._template = None
+        self._lines = {}
+        self.rows_drawn = 0
+
+    def render(self, table, caption=None, caption_short=None, label=None):
+        """
+        Draw the current state of a table. The output is the same as draw_latex with the same options.
+
+        :param table: Texttable table, LatexTable, or a list of rows (anything accepted by draw_latex).
+        :param caption: A string that adds a caption to the Latex formatting.
+        :param caption_short: A string that adds a short caption (used in the list of tables).
+        :param label: A string that adds a referencing label to the Latex formatting.
+        :return: The formatted Latex table returned as a single string.
+        """
+        table = _to_latex_table(table)
+        layout = (tuple(table.header), tuple(table.align), table.deco)
+        if layout != self._layout:
+            self._template = LatexTemplate(table.header, align=table.align, deco=table.deco, **self._options)
+            self._layout = layout
+            self._lines = {}
+        template = self._template
+
+        # Reuse the cached line of each unchanged row, and only draw the new or changed rows
+        cached_lines = self._lines
+        lines = {}
+        content = []
+        for row in template._select_rows(table):
+            line = lines.get(row)
+            if line is None:
+                line = cached_lines.get(row)
+                if line is None:
+                    line = template._draw_row(row)
+                    self.rows_drawn += 1
+                lines[row] = line
+            content.append(line)
+        self._lines = lines
+        return template._draw_lines(content, caption, caption_short, label)
+
+
+RenderCacheInfo = collections.namedtuple("RenderCacheInfo", ["hits", "misses", "evictions", "size", "bytes"])
+
+
+class RenderCache:
+    """
+    A bounded least-recently-used cache of drawn tables.
+
+    Tables are looked up by a fingerprint of their header, rows, alignment and decoration, together with every
+    draw_latex argument, so drawing the same table with the same options again returns the cached output.
+    The cache is bounded both by the number of tables and (optionally) by the total size of the cached outputs.
+    Tables drawn with a function as an option (e.g. a rows predicate), and TableStreams, are drawn without the cache.
+    It is safe to use from several threads.
+    """
+
+    def __init__(self, maxsize=128, maxbytes=None):
+        """
+        Create an empty cache.
+
+        :param maxsize: Maximum number of tables to keep in the cache.
+        :param maxbytes: Optional maximum total size in bytes of the cached outputs.
+        """
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self._entries = collections.OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def draw_latex(self, table, **kwargs):
+        """
+        Draw a table in Latex format, returning the cached output if the same table has been drawn with the same
+        options before.
+
+        :param table: Texttable table to be rendered in Latex, or anything else accepted by draw_latex.
+        :param kwargs: Optional keyword arguments, as accepted by draw_latex.
+        :return: The formatted Latex table returned as a single string.
+        """
+        table = _to_latex_table(table)
+        key = _fingerprint(table, kwargs)
+        if key is None:
+            return draw_latex(table, **kwargs)
+        with self._lock:
+            out = self._entries.get(key)
+            if out is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return out
+            self._misses += 1
+        out = draw_latex(table, **kwargs)
+        size = sys.getsizeof(out)
+        with self._lock:
+            if key not in self._entries and (self.maxbytes is None or size <= self.maxbytes):
+                self._entries[key] = out
+                self._bytes += size
+                while len(self._entries) > self.maxsize or (self.maxbytes is not None and self._bytes > self.maxbytes):
+                    _, evicted = self._entries.popitem(last=False)
+                    self._bytes -= sys.getsizeof(evicted)
+                    self._evictions += 1
+        return out
+
+    def cache_info(self):
+        """
+        :return: A RenderCacheInfo with the number of hits, misses and evictions, and the current number of cached
+                tables and their total size in bytes.
+        """
+        with self._lock:
+            return RenderCacheInfo(self._hits, self._misses, self._evictions, len(self._entries), self._bytes)
+
+    def clear(self):
+        """
+        Remove all tables from the cache and reset the statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = self._hits = self._misses = self._evictions = 0
+
+
+def _fingerprint(table, options):
+    """
+    Compute a fingerprint of a table and its draw_latex options, which changes if anything affecting the output does.
+
+    A function (e.g. a rows predicate) can only be identified by its repr, which contains its memory address and so
+    may be reused by a different function later. Tables drawn with a function option are therefore not cached.
+    Neither are TableStreams, as their rows are only known once they have been drawn.
+
+    :param table: LatexTable or TableStream table to be rendered in Latex.
+    :param options: Dict of draw_latex keyword arguments.
+    :return: The fingerprint as a hex string, or None if the table and options cannot be fingerprinted.
+    """
+    import hashlib
+
+    options = {name: value for name, value in options.items() if name not in ("workers", "stats")}
+    if isinstance(table, TableStream) or _has_callable(options):
+        return None
+    if options.get("rows") is not None:
+        # Key on the compiled selection, as the repr of a selector (e.g. a pandas Series) may be abbreviated
+        options["rows"] = _RowSelection(options["rows"])
+    fingerprint = hashlib.blake2b(digest_size=20)
+    fingerprint.update(repr((table.header, table.align, table.deco, table.n_rows, _freeze(options))).encode())
+    for column in table.columns:
+        fingerprint.update(repr(column).encode("utf-8", "surrogatepass"))
+    return fingerprint.hexdigest()
+
+
+def _has_callable(value):
+    """
+    Check whether an option value is or contains a function, including the row selector of a RenderPlan.
+
+    :param value: The option value.
+    :return: True if the value contains a function.
+    """
+    if isinstance(value, dict):
+        return any(_has_callable(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_callable(v) for v in value)
+    if isinstance(value, RenderPlan):
+        return value.selection is not None and value.selection.predicate is not None
+    return callable(value)
+
+
+def _freeze(value):
+    """
+    Convert an option value to a form whose repr only depends on its contents (e.g. dicts are sorted by key).
+
+    :param value: The option value.
+    :return: The frozen value.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((repr(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, RenderPlan):
+        return "RenderPlan", value.header, value.columns, tuple(sorted(value.dropped_rows)), _freeze(value.selection)
+    if isinstance(value, _RowSelection):
+        indices = tuple(value._indices) if value._indices is not None else None
+        return "rows", value._slice, indices, value._bools
+    if hasattr(value, "__array__"):
+        # The repr of a large NumPy array or pandas Series is abbreviated, so use its contents
+        import numpy
+
+        array = numpy.asarray(value)
+        if array.dtype.kind == "O":
+            return "array", array.shape, _freeze(array.ravel().tolist())
+        return "array", array.dtype.str, array.shape, array.tobytes()
+    return value
+
+
+class RenderStats:
+    """
+    Statistics about drawing tables, filled in by draw_latex when given as its stats argument, or by collect_stats.
+    The statistics of several tables are added together.
+
+    The wall time of each stage is kept in stage_times, in seconds:
+
+    - convert: converting the input (e.g. a Texttable or list of rows) to a LatexTable.
+    - prepare: checking the options and resolving the dropped columns and rows.
+    - clean: applying aliases and escaping, and removing newlines from cells.
+    - draw: drawing the Latex output, not including cleaning.
+
+    The other attributes count the tables drawn (calls), the cells drawn (not including the header), the characters
+    of Latex output, the alias replacements made, and the rows and columns dropped.
+    When rows are drawn by worker processes, their cleaning is part of the draw time and their alias replacements
+    are not counted. Tables taken from a RenderCache are not drawn, so are not counted.
+    """
+
+    STAGES = ("convert", "prepare", "clean", "draw")
+
+    def __init__(self):
+        self.calls = 0
+        self.stage_times = dict.fromkeys(self.STAGES, 0.0)
+        self.cells = 0
+        self.characters = 0
+        self.alias_replacements = 0
+        self.rows_dropped = 0
+        self.columns_dropped = 0
+
+    @property
+    def total_time(self):
+        """
+        :return: The total wall time of all stages, in seconds.
+        """
+        return sum(self.stage_times.values())
+
+    def add(self, other):
+        """
+        Add the statistics of another RenderStats to this one.
+
+        :param other: The RenderStats to add.
+        :return: None
+        """
+        self.calls += other.calls
+        for stage, stage_time in other.stage_times.items():
+            self.stage_times[stage] += stage_time
+        self.cells += other.cells
+        self.characters += other.characters
+        self.alias_replacements += other.alias_replacements
+        self.rows_dropped += other.rows_dropped
+        self.columns_dropped += other.columns_dropped
+
+    def __repr__(self):
+        return ("RenderStats(calls={:d}, stage_times={{{:s}}}, cells={:d}, characters={:d}, alias_replacements={:d}, "
+                "rows_dropped={:d}, columns_dropped={:d})").format(
+            self.calls, ", ".join("{!r}: {:.6f}".format(stage, stage_time)
+                                  for stage, stage_time in self.stage_times.items()),
+            self.cells, self.characters, self.alias_replacements, self.rows_dropped, self.columns_dropped)
+
+
+def _iter_with_stats(pieces, call_stats, stats_targets, table, plan, count_rows=True):
+    """
+    Time the drawing of a table and count its output, then add its statistics to each target once it is drawn.
+    Only the time taken to generate each piece is counted, not the time the caller spends using it.
+
+    :param pieces: A generator over the strings that make up the formatted Latex table.
+    :param call_stats: The RenderStats of the table, with the statistics recorded before drawing.
+    :param stats_targets: A tuple of RenderStats to add to, or functions to call with call_stats.
+    :param table: LatexTable or TableStream being drawn.
+    :param plan: RenderPlan describing the columns and rows to draw.
+    :param count_rows: Whether the number of rows drawn can be computed from the plan, rather than counted as the
+            cells are cleaned (which is not the case for a summary).
+    :return: A generator over the same strings as pieces.
+    """
+    draw_time = 0.0
+    clean_time = call_stats.stage_times["clean"]
+    try:
+        while True:
+            start = time.perf_counter()
+            piece = next(pieces, None)
+            draw_time += time.perf_counter() - start
+            if piece is None:
+                break
+            call_stats.characters += len(piece)
+            yield piece
+    finally:
+        call_stats.stage_times["draw"] += draw_time - (call_stats.stage_times["clean"] - clean_time)
+        # Cells are counted as they are cleaned, unless the number of rows drawn can be computed (e.g. when the rows
+        # were drawn by worker processes)
+        n_drawn = plan.count_rows(table.n_rows) if count_rows and table.n_rows is not None else None
+        if n_drawn is not None:
+            call_stats.cells = n_drawn * len(plan.columns)
+        elif table.n_rows is not None and plan.columns:
+            n_drawn = call_stats.cells // len(plan.columns)
+        if n_drawn is not None:
+            call_stats.rows_dropped = table.n_rows - n_drawn
+        for target in stats_targets:
+            if isinstance(target, RenderStats):
+                target.add(call_stats)
+            else:
+                target(call_stats)
+
+
+class _TimedCellCleaner:
+    """
+    Wraps a _CellCleaner to record the time spent cleaning and the number of alias replacements in a RenderStats.
+    Pickled as the wrapped cleaner, so worker processes clean without recording.
+    """
+
+    __slots__ = ("cleaner", "stats", "_count_alias")
+
+    def __init__(self, cleaner, stats, alias):
+        self.cleaner = cleaner
+        self.stats = stats
+        apply_alias = _compile_alias(tuple(alias.items())) if alias else str
+        self._count_alias = None if apply_alias is str else apply_alias.count
+
+    def row(self, row):
+        start = time.perf_counter()
+        clean_row = self.cleaner.row(row)
+        self.stats.stage_times["clean"] += time.perf_counter() - start
+        self.stats.cells += len(row)
+        if self._count_alias is not None:
+            self.stats.alias_replacements += sum(map(self._count_alias, row))
+        return clean_row
+
+    def header(self, header):
+        start = time.perf_counter()
+        clean_header = self.cleaner.header(header)
+        self.stats.stage_times["clean"] += time.perf_counter() - start
+        if self._count_alias is not None:
+            self.stats.alias_replacements += sum(map(self._count_alias, header))
+        return clean_header
+
+    def __reduce__(self):
+        return self.cleaner.__reduce__()
+
+
+class _HighlightCellCleaner:
+    """
+    Wraps a _CellCleaner to highlight the best values of some columns, see _find_highlights.
+    """
+
+    __slots__ = ("cleaner", "highlights")
+
+    def __init__(self, cleaner, highlights):
+        self.cleaner = cleaner
+        self.highlights = highlights
+
+    def row(self, row):
+        clean_row = list(_clean_row(row) if self.cleaner is None else self.cleaner.row(row))
+        for position, best, second in self.highlights:
+            key = _numeric_key(row[position])
+            if key == best:
+                clean_row[position] = "\\textbf{" + clean_row[position] + "}"
+            elif key == second:
+                clean_row[position] = "\\underline{" + clean_row[position] + "}"
+        return clean_row
+
+    def header(self, header):
+        return header if self.cleaner is None else self.cleaner.header(header)
+
+    def __reduce__(self):
+        return _HighlightCellCleaner, (self.cleaner, self.highlights)
+
+
+class _TeeCellCleaner:
+    """
+    Wraps a _CellCleaner to also write each cleaned row to other formats, see write_formats.
+    Rows have their newlines removed once for every format, and are then escaped for Latex if needed. Aliases are
+    applied before newlines are removed, so rows are cleaned for Latex from their original cells when there are
+    aliases.
+    """
+
+    __slots__ = ("cleaner", "sinks", "_reuse_row")
+
+    def __init__(self, cleaner, sinks):
+        self.cleaner = cleaner
+        self.sinks = sinks
+        self._reuse_row = cleaner is not None and not cleaner.alias_items
+
+    def row(self, row):
+        clean_row = _clean_row(row)
+        for emitter, fp in self.sinks:
+            fp.write(emitter.row(clean_row))
+        if self.cleaner is None:
+            return clean_row
+        if self._reuse_row:
+            return self.cleaner.row_without_newlines(clean_row)
+        return self.cleaner.row(row)
+
+    def header(self, header):
+        return header if self.cleaner is None else self.cleaner.header(header)
+
+
+class _MarkdownEmitter:
+    """
+    Draws a table as a GitHub flavoured Markdown table, one row at a time. See write_formats.
+    """
+
+    _RULES = {"l": ":---", "c": ":---:", "r": "---:"}
+
+    def __init__(self, header, align, deco, caption=None, max_width=0):
+        self.header = header
+        self.align = align
+
+    @staticmethod
+    def _line(cells):
+        return "| " + " | ".join(cell.replace("|", "\\|") for cell in cells) + " |"
+
+    def begin(self):
+        return self._line(self.header) + "\n|" + "|".join(" {:s} ".format(self._RULES.get(a, "---"))
+                                                          for a in self.align) + "|"
+
+    def row(self, row):
+        return "\n" + self._line(row)
+
+    def end(self):
+        return ""
+
+
+class _HtmlEmitter:
+    """
+    Draws a table as an HTML table, one row at a time. See write_formats.
+    """
+
+    _STYLES = {"c": ' style="text-align: center"', "r": ' style="text-align: right"'}
+
+    def __init__(self, header, align, deco, caption=None, max_width=0):
+        import html
+
+        self._escape = html.escape
+        self.header = header
+        self.caption = caption
+        self._cell_tags = [("<td{:s}>".format(self._STYLES.get(a, "")), "</td>") for a in align]
+        self._header_tags = [("<th{:s}>".format(self._STYLES.get(a, "")), "</th>") for a in align]
+
+    def _line(self, cells, tags):
+        escape = self._escape
+        return "<tr>" + "".join(start + escape(cell) + end for cell, (start, end) in zip(cells, tags)) + "</tr>"
+
+    def begin(self):
+        out = "<table>\n"
+        if self.caption is not None:
+            out += "  <caption>" + self._escape(self.caption) + "</caption>\n"
+        return out + "  <thead>\n    " + self._line(self.header, self._header_tags) + "\n  </thead>\n  <tbody>"
+
+    def row(self, row):
+        return "\n    " + self._line(row, self._cell_tags)
+
+    def end(self):
+        return "\n  </tbody>\n</table>"
+
+
+class _TextEmitter:
+    """
+    Draws a table in the same layout as Texttable.draw. The column widths are tracked as the rows arrive, but the rows
+    are held until the end, as the widths depend on every row. See write_formats.
+    Cells are wrapped as by Texttable when the table would be wider than max_width (0 for unlimited).
+    """
+
+    def __init__(self, header, align, deco, caption=None, max_width=80):
+        self.header = header
+        self.align = align
+        self.deco = deco
+        self.max_width = max_width
+        self.widths = [self._width(cell) for cell in header]
+        self.rows = []
+
+    @staticmethod
+    def _width(cell):
+        """
+        Width of a cell when printed, counting wide characters twice and expanding tabs, as by Texttable.
+        """
+        if cell.isascii() and cell.isprintable():
+            return len(cell)
+        try:
+            from wcwidth import wcwidth
+        except ImportError:
+            import unicodedata
+
+            def wcwidth(char):
+                if unicodedata.east_asian_width(char) in "WF":
+                    return 2
+                return 0 if unicodedata.combining(char) else 1
+
+        width = 0
+        for char in cell:
+            if char == "\t":
+                width = (width // 8 + 1) * 8
+            else:
+                width += max(0, wcwidth(char))
+        return width
+
+    @staticmethod
+    def _wrap(cell, width):
+        if not cell.strip():
+            return [""]
+        if len(cell) <= width and not cell[-1].isspace() and cell.isprintable():
+            return [cell]
+        import textwrap
+
+        return textwrap.wrap(cell, width)
+
+    def _fit_widths(self, deco_width):
+        """
+        Shrink the column widths to fit in max_width, handing out the available width one column at a time.
+        """
+        widths = self.widths
+        n_columns = len(widths)
+        if not self.max_width or sum(widths) + deco_width <= self.max_width:
+            return widths
+        if self.max_width < n_columns + deco_width:
+            raise ValueError("max_width too low to render data")
+        available = self.max_width - deco_width
+        fitted = [0] * n_columns
+        i = 0
+        while available > 0:
+            if fitted[i] < widths[i]:
+                fitted[i] += 1
+                available -= 1
+            i = (i + 1) % n_columns
+        return fitted
+
+    def _lines(self, cells, widths, align, separator, start, end):
+        wrapped = [self._wrap(cell, width) for cell, width in zip(cells, widths)]
+        for i in range(max(len(lines) for lines in wrapped)):
+            out = []
+            for lines, width, a in zip(wrapped, widths, align):
+                line = lines[i] if i < len(lines) else ""
+                fill = width - self._width(line)
+                if a == "r":
+                    out.append(" " * fill + line)
+                elif a == "c":
+                    out.append(" " * (fill // 2) + line + " " * (fill - fill // 2))
+                else:
+                    out.append(line + " " * fill)
+            yield start + separator.join(out) + end
+
+    def begin(self):
+        return ""
+
+    def row(self, row):
+        self.rows.append(row)
+        self.widths = list(map(max, self.widths, map(self._width, row)))
+        return ""
+
+    def end(self):
+        if not self.header:
+            return ""
+        border = self.deco & LatexTable.BORDER > 0
+        vlines = self.deco & LatexTable.VLINES > 0
+        widths = self._fit_widths(3 * (len(self.widths) - 1) + (4 if border else 0))
+
+        def hline(horizontal):
+            line = (horizontal + ("+" if vlines else horizontal) + horizontal).join(horizontal * n for n in widths)
+            return "+" + horizontal + line + horizontal + "+" if border else line
+
+        separator = " | " if vlines else "   "
+        start, end = ("| ", " |") if border else ("", "")
+        out = [hline("-")] if border else []
+        out.extend(self._lines(self.header, widths, ["c"] * len(widths), separator, start, end))
+        if self.deco & LatexTable.HEADER:
+            out.append(hline("="))
+        row_line = hline("-") if self.deco & LatexTable.HLINES else None
+        for i, row in enumerate(self.rows):
+            if i and row_line is not None:
+                out.append(row_line)
+            out.extend(self._lines(row, widths, self.align, separator, start, end))
+        if border:
+            out.append(hline("-"))
+        return "\n".join(out)
+
+
+_EMITTERS = {"markdown": _MarkdownEmitter, "html": _HtmlEmitter, "text": _TextEmitter}
+
+
 def _draw_latex_preamble(table, position, caption, caption_short, use_booktabs):
     """
     Draw the Latex table preamble.
@@ -119,41 +2512,68 @@ def _draw_latex_preamble(table, position, caption, caption_short, use_booktabs):
             \\begin{center}
                 \\begin{tabular}{|l|r|c|}
 
-    :param table: Texttable table to be rendered in Latex.
+    :param table: LatexTable table to be rendered in Latex.
     :return: The Latex table preamble as a single string.
     """
-    # Start table with optional position
+    # Start table with optional position, then add caption if given
+    return (_draw_table_begin(position)
+            + _draw_table_caption(caption, caption_short)
+            + _draw_tabular_begin(table, use_booktabs))
+
+
+def _draw_table_begin(position):
+    """
+    Begin the Latex table environment, with an optional float position.
+
+    :param position: A string that represents LaTex's float position of the table.
+    :return: The start of the Latex table as a single string.
+    """
     out = "\\begin{table}"
     if position is not None:
         out += '[{}]'.format(position)
     out += "\n"
+    return out
 
-    # Add caption if given
-    out += _draw_table_caption(caption, caption_short)
 
+def _draw_tabular_begin(table, use_booktabs):
+    """
+    Begin the center and tabular environments.
+
+    Applies column horizontal alignment, columns vlines, and table vertical border if appropriate.
+
+    :param table: LatexTable table to be rendered in Latex.
+    :param use_booktabs: Whether booktabs formatting is used, in which case vlines and borders are not drawn.
+    :return: The start of the center and tabular environments as a single string.
+    """
     # Begin center
-    out += _indent_text("\\begin{center}\n", 1)
+    out = _indent_text("\\begin{center}\n", 1)
+    out += _indent_text("\\begin{tabular}" + _draw_column_spec(table, use_booktabs) + "\n", 2)
+    return out
+
+
+def _draw_column_spec(table, use_booktabs):
+    """
+    Draw the column specification of a tabular (or longtable) environment.
 
+    Applies column horizontal alignment, columns vlines, and table vertical border if appropriate.
+
+    :param table: LatexTable table to be rendered in Latex.
+    :param use_booktabs: Whether booktabs formatting is used, in which case vlines and borders are not drawn.
+    :return: The column specification, for example {|l|r|c|}.
+    """
     # Column setup with/without vlines
-    #  If texttable align not set, default to left alignment (as per texttable)
-    if not hasattr(table, "_align"):
-        table._align = ["l"] * table._row_size
-    if table._has_vlines() and not use_booktabs:
-        column_str = "|".join(table._align)
+    if table.has_vlines() and not use_booktabs:
+        column_str = "|".join(table.align)
     else:
-        column_str = "".join(table._align)
+        column_str = "".join(table.align)
 
     # Border with/without edges
-    if table._has_border() and not use_booktabs:
-        tabular_str = "\\begin{tabular}{|" + column_str + "|}\n"
-    else:
-        tabular_str = "\\begin{tabular}{" + column_str + "}\n"
-    out += _indent_text(tabular_str, 2)
-
-    return out
+    if table.has_border() and not use_booktabs:
+        return "{|" + column_str + "|}"
+    return "{" + column_str + "}"
 
 
-def _draw_latex_header(table, drop_columns, use_booktabs, multicolumn_header):
+def _draw_latex_header(table, plan, use_booktabs, multicolumn_header, cleaner=None, indent=3):
     """
     Draw the Latex header.
 
@@ -165,39 +2585,43 @@ def _draw_latex_header(table, drop_columns, use_booktabs, multicolumn_header):
         Name & Age & Nickname \\\\
         \\hline
 
-    :param table: Texttable table to be rendered in Latex.
-    :param drop_columns: A list of columns that should not be in the final Latex output.
+    :param table: LatexTable table to be rendered in Latex.
+    :param plan: RenderPlan describing the columns to draw.
     :param multicolumn_header: A list of 2-tuples describing multicolumn header names and their widths.
+    :param cleaner: Optional _CellCleaner that applies aliases and escaping to the header names.
+    :param indent: Number of tabs to indent each line by.
     :return: The Latex table header as a single string.
     """
     # Top rule
     out = ""
-    if table._has_border() or use_booktabs:
-        rule = 'toprule' if use_booktabs else 'hline'
-        out += _indent_text("\\{}\n".format(rule), 3)
+    rule = 'toprule' if use_booktabs else 'hline'
+    if table.has_border() or use_booktabs:
+        out += _indent_text("\\{}\n".format(rule), indent)
 
     # Drop header columns if required
-    header = _drop_columns(table._header.copy(), table._header, drop_columns)
+    header = plan.project(table.header)
+    if cleaner is not None:
+        header = cleaner.header(header)
 
     # Multicolumn header
     if multicolumn_header is not None:
         multicolumn_header_str = [f"\\multicolumn{{{count}}}{'{|c|}' if idx == 0 else '{c|}'}{{{name}}}" for idx, (name, count) in enumerate(multicolumn_header)]
-        out += _indent_text(" & ".join(multicolumn_header_str) + " \\\\\n", 3)
-        out += _indent_text("\\{}\n".format(rule), 3)
+        out += _indent_text(" & ".join(multicolumn_header_str) + " \\\\\n", indent)
+        out += _indent_text("\\{}\n".format(rule), indent)
 
     # Normal header
-    out += _indent_text(" & ".join(header) + " \\\\\n", 3)
+    out += _indent_text(" & ".join(header) + " \\\\\n", indent)
 
     # Mid rule
-    if table._has_header() or use_booktabs:
+    if table.has_header() or use_booktabs:
         rule = 'midrule' if use_booktabs else 'hline'
-        out += _indent_text("\\{}\n".format(rule), 3)
+        out += _indent_text("\\{}\n".format(rule), indent)
     return out
 
 
-def _draw_latex_content(table, drop_columns, drop_rows, use_booktabs):
+def _iter_latex_content(table, plan, use_booktabs, cleaner=None, workers=None, merge=None, summary=None, indent=3):
     """
-    Draw the Latex table content.
+    Draw the Latex table content, yielding one line at a time.
 
     Example Output::
 
@@ -207,20 +2631,257 @@ def _draw_latex_content(table, drop_columns, drop_rows, use_booktabs):
         \\hline
         MmeLouiseBourgeau & 28 & Lou Loue \\\\
 
-    :param table: Texttable table to be rendered in Latex.
-    :param drop_columns: A list of columns that should not be in the final Latex output.
-    :param drop_columns: A list of row indices that should not be in the final Latex output.
-    :return: The Latex table content as a single string.
+    :param table: LatexTable table to be rendered in Latex.
+    :param plan: RenderPlan describing the columns and rows to draw.
+    :param cleaner: Optional _CellCleaner that applies aliases and escaping to each cell.
+    :param workers: Optional number of worker processes used to draw the rows in parallel.
+    :param merge: Optional positions of the drawn columns whose repeated cells are merged.
+            Merged rows are always drawn in the current process.
+    :param summary: Optional resolved summary of the rows to draw instead, see _resolve_summary.
+    :param indent: Number of tabs to indent each line by.
+    :return: A generator over the lines of the Latex table content.
     """
-    out = ""
-    rows = _drop_rows(table._rows, drop_rows)
-    for idx, row in enumerate(rows):
-        row = _drop_columns(row, table._header, drop_columns)
-        clean_row = _clean_row(row)
-        out += _indent_text(" & ".join(clean_row) + " \\\\\n", 3)
-        if table._has_hlines() and idx != len(table._rows) - 1 and not use_booktabs:
-            out += _indent_text("\\hline\n", 3)
-    return out
+    mask = plan.row_mask(table.n_rows)
+    rows = plan.select_rows(table, mask)
+    use_hlines = table.has_hlines() and not use_booktabs
+    if plan.selection is None:
+        # The last row index is that of the full table, so an hline is still drawn after the last row if rows were
+        # dropped, as the last row index is then never reached
+        n_rows = table.n_rows
+        hline_after_last = bool(plan.dropped_rows)
+    else:
+        n_rows = plan.count_rows(table.n_rows, mask)
+        hline_after_last = False
+    if summary is not None:
+        return _iter_latex_summary_rows(rows, summary, len(plan.columns), use_hlines, cleaner, indent=indent)
+    if merge:
+        return _iter_latex_merged_rows(rows, merge, len(plan.columns), use_hlines, cleaner,
+                                       hline_after_last=hline_after_last, indent=indent)
+    if n_rows is None:
+        # The number of rows drawn isn't known until they are read, so look one row ahead to find the last row
+        return _iter_latex_stream_rows(rows, use_hlines, cleaner, hline_after_last=hline_after_last, indent=indent)
+    last_idx = n_rows - 1
+    if workers is not None and workers > 1:
+        return _iter_latex_rows_parallel(rows, last_idx, use_hlines, cleaner, workers, indent=indent)
+    return _iter_latex_rows(rows, last_idx, use_hlines, cleaner, indent=indent)
+
+
+def _iter_latex_rows(rows, last_idx, use_hlines, cleaner=None, start=0, indent=3):
+    """
+    Draw rows of Latex table content, yielding one line at a time.
+
+    :param rows: An iterable over the rows to draw, each containing only the cells that are drawn.
+    :param last_idx: Index of the last row of the table, after which no hline is drawn.
+    :param use_hlines: Whether to draw an hline after each row.
+    :param cleaner: Optional _CellCleaner that applies aliases and escaping to each cell.
+    :param start: Index of the first row in rows, when drawing part of a table.
+    :param indent: Number of tabs to indent each line by.
+    :return: A generator over the lines of the Latex table content.
+    """
+    hline = _indent_text("\\hline\n", indent)
+    for idx, row in enumerate(rows, start):
+        clean_row = _clean_row(row) if cleaner is None else cleaner.row(row)
+        yield _indent_text(" & ".join(clean_row) + " \\\\\n", indent)
+        if use_hlines and idx != last_idx:
+            yield hline
+
+
+def _iter_latex_stream_rows(rows, use_hlines, cleaner=None, hline_after_last=False, indent=3):
+    """
+    Draw rows of Latex table content from a stream, yielding one line at a time.
+    Each row is read one ahead, so the last row is known without knowing the number of rows.
+
+    :param rows: An iterable over the rows to draw, each containing only the cells that are drawn.
+    :param use_hlines: Whether to draw an hline after each row.
+    :param cleaner: Optional _CellCleaner that applies aliases and escaping to each cell.
+    :param hline_after_last: Whether to also draw an hline after the last row.
+    :param indent: Number of tabs to indent each line by.
+    :return: A generator over the lines of the Latex table content.
+    """
+    hline = _indent_text("\\hline\n", indent)
+    rows = iter(rows)
+    row = next(rows, None)
+    while row is not None:
+        next_row = next(rows, None)
+        clean_row = _clean_row(row) if cleaner is None else cleaner.row(row)
+        yield _indent_text(" & ".join(clean_row) + " \\\\\n", indent)
+        if use_hlines and (next_row is not None or hline_after_last):
+            yield hline
+        row = next_row
+
+
+def _iter_latex_merged_rows(rows, merge, n_columns, use_hlines, cleaner=None, hline_after_last=False, indent=3):
+    """
+    Draw rows of Latex table content with repeated cells merged, yielding one line at a time.
+
+    Each row is read one ahead, so only the current row is held in memory. The cells of a run are left empty, apart
+    from the last which is drawn as \\multirow with a negative number of rows, so it spans the rows above it and the
+    run can be closed as soon as it ends. Rows within a run are separated by a \\cline over the other columns.
+
+    :param rows: An iterable over the rows to draw, each containing only the cells that are drawn.
+    :param merge: The positions of the drawn columns whose repeated cells are merged, from left to right.
+    :param n_columns: Number of drawn columns.
+    :param use_hlines: Whether to draw an hline (or cline) after each row.
+    :param cleaner: Optional _CellCleaner that applies aliases and escaping to each cell.
+    :param hline_after_last: Whether to also draw an hline after the last row.
+    :param indent: Number of tabs to indent each line by.
+    :return: A generator over the lines of the Latex table content.
+    """
+    # The rule after a row, by the number of merged columns (from the left) whose runs continue into the next row
+    rules = [_indent_text("\\hline\n", indent)]
+    for n_continued in range(1, len(merge) + 1):
+        ruled = [pos for pos in range(n_columns) if pos not in merge[:n_continued]]
+        clines = ""
+        # Group the ruled columns into ranges of consecutive columns
+        for _, group in itertools.groupby(enumerate(ruled), key=lambda item: item[1] - item[0]):
+            group = [pos for _, pos in group]
+            clines += "\\cline{{{:d}-{:d}}}".format(group[0] + 1, group[-1] + 1)
+        rules.append(_indent_text(clines + "\n", indent) if clines else "")
+    run_lengths = [1] * len(merge)
+    rows = iter(rows)
+    row = next(rows, None)
+    while row is not None:
+        next_row = next(rows, None)
+        n_continued = 0
+        if next_row is not None:
+            for pos in merge:
+                if next_row[pos] != row[pos]:
+                    break
+                n_continued += 1
+        clean_row = list(_clean_row(row) if cleaner is None else cleaner.row(row))
+        for merge_idx, pos in enumerate(merge):
+            if merge_idx < n_continued:
+                clean_row[pos] = ""
+                run_lengths[merge_idx] += 1
+            elif run_lengths[merge_idx] > 1:
+                clean_row[pos] = "\\multirow{{-{:d}}}{{*}}{{{:s}}}".format(run_lengths[merge_idx], clean_row[pos])
+                run_lengths[merge_idx] = 1
+        yield _indent_text(" & ".join(clean_row) + " \\\\\n", indent)
+        if use_hlines and (next_row is not None or hline_after_last):
+            rule = rules[n_continued]
+            if rule:
+                yield rule
+        row = next_row
+
+
+def _iter_latex_summary_rows(rows, summary, n_columns, use_hlines, cleaner=None, indent=3):
+    """
+    Draw a summary of rows of Latex table content, yielding one line at a time. See _summarise_rows.
+
+    :param rows: An iterable over the rows to summarise, each containing only the cells that are drawn.
+    :param summary: The resolved summary, see _resolve_summary.
+    :param n_columns: Number of drawn columns.
+    :param use_hlines: Whether to draw an hline after each row.
+    :param cleaner: Optional _CellCleaner that applies aliases and escaping to each cell.
+    :param indent: Number of tabs to indent each line by.
+    :return: A generator over the lines of the Latex table content.
+    """
+    hline = _indent_text("\\hline\n", indent)
+    ellipsis = _indent_text(" & ".join(["$\\vdots$"] * n_columns) + " \\\\\n", indent)
+    rows = _summarise_rows(rows, summary)
+    row = next(rows, None)
+    while row is not None:
+        next_row = next(rows, None)
+        if row is _ELLIPSIS:
+            yield ellipsis
+        else:
+            clean_row = _clean_row(row) if cleaner is None else cleaner.row(row)
+            yield _indent_text(" & ".join(clean_row) + " \\\\\n", indent)
+        if use_hlines and next_row is not None:
+            yield hline
+        row = next_row
+
+
+# Marks the rows left out of a head and tail summary
+_ELLIPSIS = ()
+
+
+def _summarise_rows(rows, summary):
+    """
+    Summarise rows in a single pass, holding at most k rows in memory.
+
+    Head and tail summaries yield the first k rows as they are read, keep the last k rows in a ring buffer, then yield
+    _ELLIPSIS if any rows were left out, followed by the last k rows. Top-k summaries keep the k largest rows in a heap.
+
+    :param rows: An iterable over the rows to summarise.
+    :param summary: The resolved summary, see _resolve_summary.
+    :return: A generator over the rows of the summary.
+    """
+    rows = iter(rows)
+    if summary[0] == "headtail":
+        k = summary[1]
+        yield from itertools.islice(rows, k)
+        tail = collections.deque(maxlen=k)
+        n_rest = 0
+        for n_rest, row in enumerate(rows, 1):
+            tail.append(row)
+        if n_rest > k:
+            yield _ELLIPSIS
+        yield from tail
+    else:
+        import heapq
+
+        _, position, k = summary
+        yield from heapq.nlargest(k, rows, key=lambda row: _numeric_key(row[position]))
+
+
+def _numeric_key(cell):
+    """
+    Rank a formatted cell by its number. Thousands separators are ignored, and cells that are not numbers (including
+    nan) are ranked below all numbers.
+
+    :param cell: The formatted cell.
+    :return: A key that orders cells by their number.
+    """
+    try:
+        value = float(cell.replace(",", ""))
+    except ValueError:
+        return 0, 0.0
+    return (0, 0.0) if value != value else (1, value)
+
+
+def _iter_latex_rows_parallel(rows, last_idx, use_hlines, cleaner, workers, chunk_size=10000, indent=3):
+    """
+    Draw rows of Latex table content in parallel, yielding the drawn chunks of rows in order.
+
+    The rows are split into chunks which are drawn by a pool of workers. Only a few chunks per worker are in flight
+    at once, so memory stays bounded for very large tables. The joined output is identical to _iter_latex_rows.
+
+    :param rows: An iterable over the rows to draw, each containing only the cells that are drawn.
+    :param last_idx: Index of the last row of the table, after which no hline is drawn.
+    :param use_hlines: Whether to draw an hline after each row.
+    :param cleaner: Optional _CellCleaner that applies aliases and escaping to each cell.
+    :param workers: Number of workers.
+    :param chunk_size: Maximum number of rows in each chunk.
+    :param indent: Number of tabs to indent each line by.
+    :return: A generator over the drawn chunks of rows, each as a single string.
+    """
+    # Aim for a few chunks per worker, so small tables are still split between the workers
+    chunk_size = max(1, min(chunk_size, -(-(last_idx + 1) // (workers * 4))))
+    rows = iter(rows)
+    with _make_executor(workers) as executor:
+        pending = collections.deque()
+        start = 0
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                break
+            pending.append(executor.submit(_draw_latex_rows_chunk, chunk, last_idx, use_hlines, cleaner, start,
+                                           indent))
+            start += len(chunk)
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _draw_latex_rows_chunk(rows, last_idx, use_hlines, cleaner, start, indent):
+    """
+    Draw a chunk of rows in a worker. See _iter_latex_rows for a description of the arguments.
+
+    :return: The drawn rows as a single string.
+    """
+    return "".join(_iter_latex_rows(rows, last_idx, use_hlines, cleaner, start, indent))
 
 
 def _draw_latex_postamble(table, caption, caption_short, label, use_booktabs):
@@ -238,21 +2899,14 @@ def _draw_latex_postamble(table, caption, caption_short, label, use_booktabs):
         \\label{table:example_table}
     \\end{table}
 
-    :param table: Texttable table to be rendered in Latex.
+    :param table: LatexTable table to be rendered in Latex.
     :param caption: A caption to add to the table.
     :param caption_short: Short caption used in the list of tables. Ignored if caption is None.
     :param label: A label to add to the table.
     :return: The Latex table postamble as one string.
     """
-    # Add bottom rule
-    out = ""
-    if table._has_border() or use_booktabs:
-        rule = 'bottomrule' if use_booktabs else 'hline'
-        out += _indent_text("\\{}\n".format(rule), 3)
-
-    # Close tabular and center environments
-    out += _indent_text("\\end{tabular}\n", 2)
-    out += _indent_text("\\end{center}\n", 1)
+    # Add bottom rule, and close tabular and center environments
+    out = _draw_tabular_end(table, use_booktabs)
 
     # Add caption if given
     out += _draw_table_caption(caption, caption_short)
@@ -266,6 +2920,38 @@ def _draw_latex_postamble(table, caption, caption_short, label, use_booktabs):
     return out
 
 
+def _draw_tabular_end(table, use_booktabs):
+    """
+    End the tabular and center environments, applying the table bottom border if appropriate.
+
+    :param table: LatexTable table to be rendered in Latex.
+    :param use_booktabs: Whether booktabs formatting is used.
+    :return: The end of the tabular and center environments as a single string.
+    """
+    # Add bottom rule
+    out = _draw_bottom_rule(table, use_booktabs)
+
+    # Close tabular and center environments
+    out += _indent_text("\\end{tabular}\n", 2)
+    out += _indent_text("\\end{center}\n", 1)
+    return out
+
+
+def _draw_bottom_rule(table, use_booktabs, indent=3):
+    """
+    Draw the table bottom border if appropriate.
+
+    :param table: LatexTable table to be rendered in Latex.
+    :param use_booktabs: Whether booktabs formatting is used.
+    :param indent: Number of tabs to indent the rule by.
+    :return: The bottom rule as a single string, which is empty if there is no bottom border.
+    """
+    if table.has_border() or use_booktabs:
+        rule = 'bottomrule' if use_booktabs else 'hline'
+        return _indent_text("\\{}\n".format(rule), indent)
+    return ""
+
+
 def _draw_table_caption(caption, caption_short):
     """
     Add a caption to the table, with an optional short version (for table of contents etc.).
@@ -283,6 +2969,158 @@ def _draw_table_caption(caption, caption_short):
     return out
 
 
+def _format_cell(value, auto=True):
+    """
+    Format a cell value as a string.
+    With auto formatting, numbers (and strings that are numbers) are formatted as per Texttable's automatic data type
+    (integers as they are, floats to three decimal places, and very large numbers in exponential notation).
+    Other strings are kept as they are.
+
+    :param value: The cell value to format.
+    :param auto: Whether to apply automatic number formatting. If False, the value is simply converted to a string.
+    :return: The formatted cell.
+    """
+    if isinstance(value, bytes):
+        value = value.decode("utf-8", "replace")
+    if isinstance(value, str):
+        if not auto:
+            return value
+        try:
+            f = float(value)
+        except ValueError:
+            return value
+    elif not auto:
+        return str(value)
+    else:
+        try:
+            f = float(value)
+        except (TypeError, ValueError):
+            return str(value)
+    if abs(f) > 1e8:
+        return "%.3e" % f
+    if f != f:
+        return str(value)
+    if f - round(f) == 0:
+        if isinstance(value, bool):
+            return str(value)
+        return str(value) if type(value) == int else str(int(round(f)))
+    return "%.3f" % f
+
+
+def _format_column(values, precision, scientific, thousands):
+    """
+    Format a column of a NumPy array as strings.
+    Integer and float columns are formatted with a single string formatting call for the whole column.
+    Other columns are formatted one cell at a time, as per _format_cell.
+
+    :param values: 1-dimensional NumPy array of cell values.
+    :param precision: Number of decimal places for float values.
+    :param scientific: Whether to use scientific notation for float values.
+    :param thousands: Whether to add thousands separators to numeric values.
+    :return: A list of formatted cells.
+    """
+    kind = values.dtype.kind
+    if kind in "iu":
+        fmt = "{:,d}\n" if thousands else "%d\n"
+    elif kind == "f":
+        spec = "{:d}{:s}".format(precision, "e" if scientific else "f")
+        fmt = "{:,." + spec + "}\n" if thousands else "%." + spec + "\n"
+    else:
+        return [v if type(v) is str else _format_cell(v) for v in values.tolist()]
+    if not len(values):
+        return []
+    values = values.tolist()
+    # One formatting call for the whole column, then split on the newlines (numbers never contain a newline)
+    if thousands:
+        out = (fmt * len(values)).format(*values)
+    else:
+        out = (fmt * len(values)) % tuple(values)
+    return out.split("\n")[:-1]
+
+
+def _format_pandas_column(column, precision, scientific, thousands):
+    """
+    Format a pandas Series or Index as strings, as per _format_column.
+    Columns with a pandas extension data type (e.g. Int64 or boolean) keep their type, and their missing values are
+    formatted as empty strings, as for Arrow columns.
+
+    :param column: The pandas Series or Index of cell values.
+    :param precision: Number of decimal places for float values.
+    :param scientific: Whether to use scientific notation for float values.
+    :param thousands: Whether to add thousands separators to numeric values.
+    :return: A list of formatted cells.
+    """
+    import numpy
+
+    dtype = column.dtype
+    if isinstance(dtype, numpy.dtype):
+        return _format_column(column.to_numpy(), precision, scientific, thousands)
+    numpy_dtype = getattr(dtype, "numpy_dtype", None)
+    if dtype.kind in "iuf" and numpy_dtype is not None and numpy_dtype.kind == dtype.kind:
+        values = column.to_numpy(dtype=numpy_dtype, na_value=0)
+    else:
+        values = column.to_numpy(dtype=object, na_value=None)
+    cells = _format_column(values, precision, scientific, thousands)
+    for idx in numpy.flatnonzero(numpy.asarray(column.isna())).tolist():
+        cells[idx] = ""
+    return cells
+
+
+def _format_arrow_column(array, precision, scientific, thousands):
+    """
+    Format a pyarrow Array as strings. Null cells are formatted as empty strings.
+    Integer columns are cast to strings with Arrow's compute kernel, float columns are formatted as per _format_column,
+    and other columns one cell at a time, as per _format_cell.
+
+    :param array: The pyarrow Array of cell values.
+    :param precision: Number of decimal places for float values.
+    :param scientific: Whether to use scientific notation for float values.
+    :param thousands: Whether to add thousands separators to numeric values.
+    :return: A list of formatted cells.
+    """
+    import pyarrow
+    import pyarrow.compute
+
+    if pyarrow.types.is_integer(array.type) and not thousands:
+        return pyarrow.compute.fill_null(pyarrow.compute.cast(array, pyarrow.string()), "").to_pylist()
+    if pyarrow.types.is_integer(array.type) or pyarrow.types.is_floating(array.type):
+        cells = _format_column(pyarrow.compute.fill_null(array, 0).to_numpy(), precision, scientific, thousands)
+        if array.null_count:
+            for idx in pyarrow.compute.indices_nonzero(array.is_null()).to_pylist():
+                cells[idx] = ""
+        return cells
+    if pyarrow.types.is_string(array.type) or pyarrow.types.is_large_string(array.type):
+        return pyarrow.compute.fill_null(array, "").to_pylist()
+    return ["" if cell is None else cell if type(cell) is str else _format_cell(cell) for cell in array.to_pylist()]
+
+
+def _iter_arrow_rows(batches, options):
+    """
+    Format Arrow record batches one at a time, and yield their rows.
+
+    :param batches: An iterator over pyarrow RecordBatches.
+    :param options: A (precision, scientific, thousands) tuple for each column.
+    :return: A generator over the rows, each as a tuple of cells.
+    """
+    for batch in batches:
+        yield from zip(*[_format_arrow_column(column, *column_options)
+                         for column, column_options in zip(batch.columns, options)])
+
+
+def _column_option(option, column, default):
+    """
+    Get the value of a formatting option for a column.
+
+    :param option: Either a single value used for all columns, or a dict of column name -> value.
+    :param column: The column name.
+    :param default: The value to use if the option is a dict without an entry for the column.
+    :return: The option value for the column.
+    """
+    if isinstance(option, dict):
+        return option.get(column, default)
+    return option
+
+
 def _clean_row(row):
     """
     Clean a row prior to drawing. Currently just removes newlines.
@@ -296,6 +3134,275 @@ def _clean_row(row):
     return clean_row
 
 
+@functools.lru_cache(maxsize=32)
+def _compile_alias(alias_items):
+    """
+    Compile alias (source, destination) pairs into a single function that applies every alias to a string in one pass.
+
+    All source strings are combined into one regex alternation, ordered longest first, so the leftmost match wins and
+    the longest source is chosen when several start at the same position.
+    Replaced text is never matched again. Empty source strings are ignored.
+    Compiled aliases are cached, so repeated calls with the same aliases only compile once.
+
+    :param alias_items: A tuple of (source, destination) string pairs.
+    :return: A function that takes a string and returns it with all aliases applied.
+    """
+    alias = {s_src: s_dst for s_src, s_dst in alias_items if s_src}
+    if not alias:
+        return str
+    return _AliasMatcher(alias_items, alias)
+
+
+class _AliasMatcher:
+    """
+    Callable that applies compiled aliases to a string. See _compile_alias.
+    Pickled by its alias items, so it can be sent to worker processes.
+    """
+
+    __slots__ = ("alias_items", "_pattern", "_sub")
+
+    def __init__(self, alias_items, alias):
+        import re
+
+        self.alias_items = alias_items
+        self._pattern = re.compile("|".join(re.escape(s_src) for s_src in sorted(alias, key=len, reverse=True)))
+        self._sub = functools.partial(self._pattern.sub, lambda match: alias[match.group()])
+
+    def __call__(self, text):
+        return self._sub(text)
+
+    def count(self, text):
+        """
+        Count the aliases that would be replaced in a string.
+
+        :param text: The string to search.
+        :return: The number of replacements.
+        """
+        return len(self._pattern.findall(text))
+
+    def __reduce__(self):
+        return _compile_alias, (self.alias_items,)
+
+
+_LATEX_SPECIAL_CHARACTERS = (("&", "\\&"), ("%", "\\%"), ("$", "\\$"), ("#", "\\#"), ("_", "\\_"),
+                             ("{", "\\{"), ("}", "\\}"), ("~", "\\textasciitilde{}"),
+                             ("^", "\\textasciicircum{}"), ("\\", "\\textbackslash{}"))
+
+
+def _escape_latex(text):
+    """
+    Escape the special Latex characters in a string.
+    Uses a fixed chain of str.replace calls, ordered so no inserted text is escaped again. Backslashes are handled by
+    splitting on them first, as their escape contains braces.
+
+    :param text: The string to escape.
+    :return: The escaped string.
+    """
+    if "\\" in text:
+        return "\\textbackslash{}".join([_escape_latex(part) for part in text.split("\\")])
+    return (text.replace("{", "\\{").replace("}", "\\}").replace("&", "\\&").replace("%", "\\%")
+            .replace("$", "\\$").replace("#", "\\#").replace("_", "\\_")
+            .replace("~", "\\textasciitilde{}").replace("^", "\\textasciicircum{}"))
+
+
+def _escape_latex_row_cell(text):
+    """
+    Escape the special Latex characters in a row cell and remove its newlines.
+
+    :param text: The cell to clean.
+    :return: The cleaned cell.
+    """
+    return _escape_latex(text).replace("\n", "")
+
+
+class _CellCleaner:
+    """
+    Prepares cells for drawing: applies aliases, escapes special Latex characters, and removes newlines from rows.
+    Header names are aliased and escaped, but keep their newlines.
+
+    Without aliases, escaping is a fixed chain of str.replace calls per cell (see _escape_latex). When aliases are
+    used as well, the escapes are added to the aliases, so each cell is scanned by a single regex and the text
+    inserted by an alias is never escaped. An alias takes priority over the escape of the same character.
+    Pickled by its arguments, so it can be sent to worker processes.
+    """
+
+    __slots__ = ("alias_items", "escape_mask", "_row_fns", "_header_fns")
+
+    def __init__(self, alias_items=(), escape_mask=()):
+        """
+        :param alias_items: A tuple of (source, destination) alias string pairs.
+        :param escape_mask: A tuple with a bool for each drawn column, True if its cells are escaped.
+        """
+        self.alias_items = alias_items
+        self.escape_mask = escape_mask
+        apply_alias = _compile_alias(alias_items)
+        if apply_alias is str:
+            plain_row = operator.methodcaller("replace", "\n", "")
+            escaped_row = _escape_latex_row_cell
+            escaped_header = _escape_latex
+        else:
+            def plain_row(cell):
+                return apply_alias(cell).replace("\n", "")
+            escaped_row = _compile_alias(_LATEX_SPECIAL_CHARACTERS + (("\n", ""),) + alias_items)
+            escaped_header = _compile_alias(_LATEX_SPECIAL_CHARACTERS + alias_items)
+        if not any(escape_mask):
+            self._row_fns = plain_row
+            self._header_fns = apply_alias
+        elif all(escape_mask):
+            self._row_fns = escaped_row
+            self._header_fns = escaped_header
+        else:
+            self._row_fns = tuple(escaped_row if escape else plain_row for escape in escape_mask)
+            self._header_fns = tuple(escaped_header if escape else apply_alias for escape in escape_mask)
+
+    def row(self, row):
+        """
+        Clean the cells of a row.
+
+        :param row: The cells of the row that are drawn.
+        :return: A list of the cleaned cells.
+        """
+        fns = self._row_fns
+        if isinstance(fns, tuple):
+            return [fn(cell) for fn, cell in zip(fns, row)]
+        return [fns(cell) for cell in row]
+
+    def row_without_newlines(self, row):
+        """
+        Clean the cells of a row that already have their newlines removed (see _clean_row), without scanning them for
+        newlines again. Only used without aliases, as aliases are applied before newlines are removed.
+
+        :param row: The cells of the row that are drawn, without newlines.
+        :return: A list of the cleaned cells.
+        """
+        return self.header(row)
+
+    def header(self, header):
+        """
+        Clean the names of the header.
+
+        :param header: The header names that are drawn.
+        :return: A list of the cleaned names.
+        """
+        fns = self._header_fns
+        if isinstance(fns, tuple):
+            return [fn(name) for fn, name in zip(fns, header)]
+        return [fns(name) for name in header]
+
+    def __reduce__(self):
+        return _CellCleaner, (self.alias_items, self.escape_mask)
+
+
+def _make_cell_cleaner(header, plan, alias, escape, raw_columns):
+    """
+    Create the cell cleaner for drawing a table, if one is needed.
+
+    :param header: The table header.
+    :param plan: RenderPlan describing the columns to draw.
+    :param alias: Optional str -> str dictionary of aliases.
+    :param escape: Whether to escape special Latex characters.
+    :param raw_columns: Optional list of columns that are not escaped. Each column must be in the table header.
+            Ignored if escape is false.
+    :return: A _CellCleaner, or None if cells only need their newlines removed.
+    """
+    if not escape:
+        return _CellCleaner(tuple(alias.items()), (False,) * len(plan.columns)) if alias else None
+    raw_columns = _resolve_drop_columns(header, raw_columns, error=RawColumnError)
+    escape_mask = tuple(column_idx not in raw_columns for column_idx in plan.columns)
+    return _CellCleaner(tuple(alias.items()) if alias else (), escape_mask)
+
+
+def _resolve_merge_columns(header, plan, merge_repeated):
+    """
+    Find the positions of the drawn columns whose repeated cells are merged.
+
+    :param header: The table header.
+    :param plan: RenderPlan describing the columns to draw.
+    :param merge_repeated: Optional list of columns to merge. Each column must be in the table header.
+    :return: A tuple of the positions of the merged columns in each drawn row, from left to right.
+    """
+    merge_columns = _resolve_drop_columns(header, merge_repeated, error=MergeColumnError)
+    return tuple(pos for pos, column_idx in enumerate(plan.columns) if column_idx in merge_columns)
+
+
+def _find_highlights(table, plan, highlight):
+    """
+    Find the best and second best values of each highlighted column, in one pass over the drawn cells of the column.
+
+    :param table: LatexTable being drawn.
+    :param plan: RenderPlan describing the columns and rows to draw.
+    :param highlight: Dict from column names to 'max' or 'min'. Each column must be in the table header.
+    :return: A tuple of (position of the column in each drawn row, best key, second best key) for each drawn
+            highlighted column, where the keys are as given by _numeric_key (or None if there is no such value).
+    """
+    modes = {}
+    for column, mode in highlight.items():
+        if mode not in ("max", "min"):
+            raise ValueError("highlight must map columns to 'max' or 'min', got {:s} for {:s}.".format(
+                str(mode), column))
+        column_idx, = _resolve_drop_columns(table.header, [column], error=HighlightColumnError)
+        modes[column_idx] = mode
+    positions = [(position, column_idx) for position, column_idx in enumerate(plan.columns) if column_idx in modes]
+    if not positions:
+        return ()
+    selection = plan.selection
+    if selection is not None and selection.predicate is not None:
+        # Rows selected by a predicate can only be found by reading the rows
+        drawn_rows = list(plan.select_rows(table))
+        columns = [[row[position] for row in drawn_rows] for position, _ in positions]
+    else:
+        mask = plan.row_mask(table.n_rows)
+        columns = [table.columns[column_idx] if mask is None else itertools.compress(table.columns[column_idx], mask)
+                   for _, column_idx in positions]
+    highlights = []
+    for (position, column_idx), cells in zip(positions, columns):
+        better = operator.gt if modes[column_idx] == "max" else operator.lt
+        best = second = None
+        for is_number, value in map(_numeric_key, cells):
+            if not is_number or value == best or value == second:
+                continue
+            if best is None or better(value, best):
+                best, second = value, best
+            elif second is None or better(value, second):
+                second = value
+        highlights.append((position,
+                           None if best is None else (1, best),
+                           None if second is None else (1, second)))
+    return tuple(highlights)
+
+
+def _resolve_summary(header, plan, summary):
+    """
+    Check a summary of the rows to draw, resolving the column of a top-k summary.
+
+    :param header: The table header.
+    :param plan: RenderPlan describing the columns to draw.
+    :param summary: Optional ('headtail', k) or ('topk', column, k) tuple. The column must be drawn.
+    :return: ('headtail', k), ('topk', position of the column in each drawn row, k), or None.
+    """
+    if summary is None:
+        return None
+    summary = tuple(summary)
+    if summary[:1] == ("headtail",) and len(summary) == 2:
+        k = summary[1]
+    elif summary[:1] == ("topk",) and len(summary) == 3:
+        k = summary[2]
+    else:
+        raise SummaryError("expected ('headtail', k) or ('topk', column, k), got {:s}".format(str(summary)))
+    if not isinstance(k, int) or k < 1:
+        raise SummaryError("k must be a positive integer, got {:s}".format(str(k)))
+    if summary[0] == "headtail":
+        return summary
+    try:
+        column_idx, = _resolve_drop_columns(header, [summary[1]])
+    except DropColumnError:
+        raise SummaryError("cannot rank by column {:s} - column not in table header ({:s})".format(
+            summary[1], str(header))) from None
+    if column_idx not in plan.columns:
+        raise SummaryError("cannot rank by column {:s} as it is dropped".format(summary[1]))
+    return "topk", plan.columns.index(column_idx), k
+
+
 def _sanitise_drop_columns(header, drop_columns, multicolumn_header):
     """
     Check the columns to be dropped - each column must be in the table header.
@@ -305,19 +3412,53 @@ def _sanitise_drop_columns(header, drop_columns, multicolumn_header):
     :param drop_columns: List of columns to be dropped.
     :return: None
     """
-    # Check columns (ignores case).
-    if drop_columns is not None:
-        for column in drop_columns:
-            if column.upper() not in [h.upper() for h in header]:
-                raise DropColumnError(column, header)
-    # Check multicolumn header
+    dropped_columns = _resolve_drop_columns(header, drop_columns)
+    _sanitise_multicolumn_header(len(header) - len(dropped_columns), multicolumn_header)
+
+
+def _sanitise_multicolumn_header(n_expected_columns, multicolumn_header):
+    """
+    Check the sum of multicolumn header widths matches the number of columns (after dropping).
+
+    :param n_expected_columns: Number of columns that are drawn.
+    :param multicolumn_header: List of 2-tuples describing multicolumn header names and their widths.
+    :return: None
+    """
     if multicolumn_header is not None:
-        n_expected_columns = len(header) if drop_columns is None else len(header) - len(drop_columns)
         sum_multicolumn = sum([h[1] for h in multicolumn_header])
         if n_expected_columns != sum_multicolumn:
             raise MulticolumnHeaderError(n_expected_columns, sum_multicolumn)
 
 
+def _resolve_drop_columns(header, drop_columns, error=DropColumnError):
+    """
+    Find the indices of the columns to be dropped - each column must be in the table header.
+    Each column name is matched exactly if possible, otherwise ignoring case.
+    If a name appears more than once in the header, the first occurrence is used.
+
+    :param header: Table header array.
+    :param drop_columns: List of columns to be dropped.
+    :param error: Exception class raised (with the column and header) if a column is not in the header.
+    :return: The set of column indices to be dropped.
+    """
+    if not drop_columns:
+        return set()
+    exact = {}
+    upper = {}
+    for column_idx, h in enumerate(header):
+        exact.setdefault(h, column_idx)
+        upper.setdefault(h.upper(), column_idx)
+    dropped_columns = set()
+    for column in drop_columns:
+        column_idx = exact.get(column)
+        if column_idx is None:
+            column_idx = upper.get(column.upper())
+        if column_idx is None:
+            raise error(column, header)
+        dropped_columns.add(column_idx)
+    return dropped_columns
+
+
 def _drop_columns(target, header, drop_columns):
     """
     Drop columns from a target array.
@@ -325,20 +3466,10 @@ def _drop_columns(target, header, drop_columns):
     :param target: Array from which the columns should be dropped.
     :param header: Table header array.
     :param drop_columns: The columns that should be dropped. Each column should be in the header.
+            Names are matched exactly if possible, otherwise ignoring case.
     :return: The target array with the relevant columns dropped.
     """
-    target = target[:]
-    if drop_columns is None:
-        return target
-    # Get indices to delete
-    to_delete = []
-    for column in drop_columns:
-        column_idx = header.index(column)
-        to_delete.append(column_idx)
-    # Delete relevant indices (in reverse order so deletion doesn't affect other index positions)
-    for i in sorted(to_delete, reverse=True):
-        del target[i]
-    return target
+    return list(RenderPlan(header, drop_columns=drop_columns).project(target))
 
 
 def _sanitise_drop_rows(n_rows, drop_rows):
@@ -365,13 +3496,10 @@ def _drop_rows(rows, drop_rows):
     :param drop_rows: List of rows to be dropped.
     :return: The target array with the relevant rows dropped.
     """
-    rows = rows[:]
-    if drop_rows is None:
-        return rows
-    # Delete relevant indices (in reverse order so deletion doesn't affect other index positions)
-    for i in sorted(drop_rows, reverse=True):
-        del rows[i]
-    return rows
+    if not drop_rows:
+        return rows[:]
+    drop_rows = set(drop_rows)
+    return [row for r_idx, row in enumerate(rows) if r_idx not in drop_rows]
 
 
 def _indent_text(text, indent):
@@ -383,3 +3511,7 @@ def _indent_text(text, indent):
     :return: The indented string.
     """
     return '\t' * indent + text
+
+
+if __name__ == "__main__":
+    sys.exit(main())
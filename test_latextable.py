@@ -1,7 +1,37 @@
+import asyncio
+import collections
+import contextlib
+import copy
+import io
+import os
+import pickle
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
 import unittest
 
+import texttable
+
 import latextable
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None
+
 
 class LatexTableTest(unittest.TestCase):
 
@@ -44,6 +74,100 @@ class LatexTableTest(unittest.TestCase):
         self.assertTrue(target[1] in two_drop)
         self.assertTrue(target[2] not in two_drop)
 
+    def test_drop_columns_ignores_case(self):
+        rows = [["Name", "Age"], ["a", "1"], ["b", "2"]]
+        out = latextable.draw_latex(rows, drop_columns=["age"])
+        self.assertNotIn("Age", out)
+        self.assertIn("a \\\\", out)
+        # An exact match is preferred over a match that ignores case
+        target = ["Row1", "Row2", "Row3"]
+        self.assertEqual(latextable._drop_columns(target, ["col", "Col", "COL"], ["Col"]), ["Row1", "Row3"])
+
+    def test_render_plan(self):
+        header = ["A", "B", "C"]
+        plan = latextable.RenderPlan(header, drop_columns=["B"], drop_rows=[0, 2])
+        self.assertEqual(plan.columns, (0, 2))
+        self.assertEqual(plan.project(["a", "b", "c"]), ("a", "c"))
+        table = latextable.LatexTable.from_rows([header] + [["a{:d}".format(i), "b", "c"] for i in range(4)])
+        self.assertEqual(list(plan.select_rows(table)), [("a1", "c"), ("a3", "c")])
+        self.assertEqual(latextable.RenderPlan(header, drop_columns=["A", "C"]).project(["a", "b", "c"]), ("b",))
+        self.assertEqual(latextable.RenderPlan(header).project(["a", "b", "c"]), ("a", "b", "c"))
+        self.assertRaises(latextable.DropColumnError, latextable.RenderPlan, header, ["D"])
+        # The same plan can be reused for tables with the same header
+        for n_rows in [3, 4]:
+            rows = [header] + [["a{:d}".format(i), "b{:d}".format(i), "c{:d}".format(i)] for i in range(n_rows)]
+            self.assertEqual(latextable.draw_latex(rows, plan=plan),
+                             latextable.draw_latex(rows, drop_columns=["B"], drop_rows=[0, 2]))
+        rows = [header, ["a0", "b0", "c0"], ["a1", "b1", "c1"]]
+        self.assertRaises(latextable.DropRowError, latextable.draw_latex, rows, plan=plan)
+        self.assertRaises(latextable.RenderPlanError, latextable.draw_latex, [["A", "B"], ["a", "b"]], plan=plan)
+
+    def test_select_rows(self):
+        header = ["A", "B"]
+        rows = [header] + [[str(i), str(i * i)] for i in range(10)]
+
+        def drawn(selected_rows, **kwargs):
+            return [line.split(" ")[0].strip() for line in latextable.draw_latex(rows, rows=selected_rows, **kwargs)
+                    .splitlines() if line.endswith("\\\\")][1:]
+
+        self.assertEqual(drawn(slice(2, 5)), ["2", "3", "4"])
+        self.assertEqual(drawn(slice(-2, None)), ["8", "9"])
+        self.assertEqual(drawn(range(0, 10, 4)), ["0", "4", "8"])
+        # Rows are drawn in table order, each at most once
+        self.assertEqual(drawn([7, 1, 1, -1]), ["1", "7", "9"])
+        self.assertEqual(drawn([i % 3 == 0 for i in range(10)]), ["0", "3", "6", "9"])
+        self.assertEqual(drawn([]), [])
+        self.assertEqual(drawn(lambda row: int(row[1]) > 40), ["7", "8", "9"])
+        # Dropped rows are applied on top of the selection, by their index in the full table
+        self.assertEqual(drawn(slice(0, 5), drop_rows=[1, 8]), ["0", "2", "3", "4"])
+        self.assertEqual(drawn(lambda row: row[0] != "4", drop_rows=[0], drop_columns=["B"]),
+                         ["1", "2", "3", "5", "6", "7", "8", "9"])
+        # There is no hline after the last selected row, unlike after the last row when only dropping rows
+        self.assertEqual(latextable.draw_latex(rows, rows=[3, 5]),
+                         latextable.draw_latex(rows[:1] + [rows[4], rows[6]]))
+        self.assertEqual(latextable.draw_latex(rows, rows=lambda row: row[0] in "35"),
+                         latextable.draw_latex(rows[:1] + [rows[4], rows[6]]))
+        # Streams are selected lazily, stopping once the last selected row is read
+        stream_rows = iter(rows[1:])
+        stream = latextable.TableStream(header, stream_rows)
+        self.assertEqual(latextable.draw_latex(stream, rows=slice(3, 6, 2)),
+                         latextable.draw_latex(rows[:1] + [rows[4], rows[6]]))
+        self.assertEqual(next(stream_rows), ["6", "36"])
+        stream = latextable.TableStream(header, iter(rows[1:]))
+        self.assertEqual(latextable.draw_latex(stream, rows=[1, 3, 5], drop_rows=[1]),
+                         latextable.draw_latex(rows[:1] + [rows[4], rows[6]]))
+        # Plans with a selection can be pickled
+        plan = pickle.loads(pickle.dumps(latextable.RenderPlan(header, rows=[3, 5])))
+        self.assertEqual(latextable.draw_latex(rows, plan=plan), latextable.draw_latex(rows, rows=[3, 5]))
+        self.assertRaises(latextable.RowSelectionError, latextable.draw_latex, rows, rows=[True, False])
+        self.assertRaises(latextable.RowSelectionError, latextable.draw_latex, rows, rows=[10])
+        self.assertRaises(latextable.RowSelectionError, latextable.draw_latex, rows, rows=slice(None, None, -1))
+        self.assertRaises(latextable.RowSelectionError, latextable.draw_latex,
+                          latextable.TableStream(header, iter(rows[1:])), rows=[-1])
+        self.assertRaises(latextable.RowSelectionError, latextable.draw_latex, rows, rows=["1"])
+        stats = latextable.RenderStats()
+        latextable.draw_latex(rows, rows=lambda row: row[0] < "3", stats=stats)
+        self.assertEqual((stats.cells, stats.rows_dropped), (6, 7))
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_select_rows_numpy(self):
+        array = numpy.arange(20).reshape(10, 2)
+        rows = [["A", "B"]] + array.tolist()
+        mask = array[:, 0] % 4 == 0
+        self.assertEqual(latextable.draw_latex(rows, rows=mask),
+                         latextable.draw_latex(rows, rows=[0, 2, 4, 6, 8]))
+        self.assertEqual(latextable.draw_latex(rows, rows=numpy.flatnonzero(mask)),
+                         latextable.draw_latex(rows, rows=[0, 2, 4, 6, 8]))
+        self.assertEqual(latextable.draw_latex(rows, rows=list(mask)),
+                         latextable.draw_latex(rows, rows=[0, 2, 4, 6, 8]))
+        self.assertEqual(latextable.draw_latex(rows, rows=list(numpy.flatnonzero(mask))),
+                         latextable.draw_latex(rows, rows=[0, 2, 4, 6, 8]))
+        self.assertRaises(latextable.RowSelectionError, latextable.draw_latex, rows, rows=mask[:5])
+        if pandas is not None:
+            df = pandas.DataFrame(array, columns=["A", "B"])
+            self.assertEqual(latextable.draw_latex(df, rows=df["A"] % 4 == 0),
+                             latextable.draw_latex(df, rows=[0, 2, 4, 6, 8]))
+
     def test_sanitise_drop_rows(self):
         rows = [["R0C0", "R0C1", "R0C2"],
                 ["R1C0", "R1C1", "R1C2"],
@@ -86,6 +210,674 @@ class LatexTableTest(unittest.TestCase):
         self.assertIn(text, two_ident)
         self.assertEqual(len(two_ident) - 2, len(text))
 
+    def test_compile_alias(self):
+        # Longest key wins when several keys match at the same position
+        apply_alias = latextable._compile_alias((('+', 'P'), ('+-', '$\\pm$')))
+        self.assertEqual(apply_alias("a +- b + c"), "a $\\pm$ b P c")
+        # Inserted text is not aliased again
+        apply_alias = latextable._compile_alias((('\\', '\\textbackslash{}'), ('{', '\\{'), ('}', '\\}')))
+        self.assertEqual(apply_alias("a\\b{c}"), "a\\textbackslash{}b\\{c\\}")
+        # Empty keys are ignored
+        apply_alias = latextable._compile_alias((('', 'X'),))
+        self.assertEqual(apply_alias("abc"), "abc")
+
+    def test_escape(self):
+        rows = [["Name_1", "Formula"], ["50% & more", "$x^2$"], ["a\\b {c}\n", "~#"]]
+        output = latextable.draw_latex(rows, escape=True, raw_columns=["formula"])
+        self.assertIn("Name\\_1 & Formula \\\\\n", output)
+        self.assertIn("50\\% \\& more & $x^2$ \\\\\n", output)
+        self.assertIn("a\\textbackslash{}b \\{c\\} & ~# \\\\\n", output)
+        # Aliases take priority over escaping, and the text they insert is not escaped
+        output = latextable.draw_latex(rows, escape=True, alias={"&": "and", "^": "$^\\circ$"})
+        self.assertIn("50\\% and more & \\$x$^\\circ$2\\$ \\\\\n", output)
+        # Escaping is the same when drawing in parallel or with a template
+        self.assertEqual(latextable.draw_latex(rows, escape=True, workers=2), latextable.draw_latex(rows, escape=True))
+        template = latextable.LatexTemplate(rows[0], escape=True)
+        self.assertEqual(template.render(rows[1:]), latextable.draw_latex(rows, escape=True))
+        with self.assertRaises(latextable.RawColumnError):
+            latextable.draw_latex(rows, escape=True, raw_columns=["Missing"])
+        self.assertEqual(latextable.draw_latex(rows, raw_columns=["Missing"]), latextable.draw_latex(rows))
+
+    def test_render_stats(self):
+        rows = [["A", "B", "C"], ["a +- b", "1", "2"], ["c", "d +- e +- f", "3"], ["g", "h", "4"]]
+        options = dict(alias={"+-": "$\\pm$"}, drop_columns=["C"], drop_rows=[2])
+        stats = latextable.RenderStats()
+        output = latextable.draw_latex(rows, stats=stats, **options)
+        self.assertEqual(output, latextable.draw_latex(rows, **options))
+        self.assertEqual(stats.calls, 1)
+        self.assertEqual(stats.cells, 4)
+        self.assertEqual(stats.characters, len(output))
+        self.assertEqual(stats.alias_replacements, 3)
+        self.assertEqual(stats.rows_dropped, 1)
+        self.assertEqual(stats.columns_dropped, 1)
+        self.assertEqual(set(stats.stage_times), set(latextable.RenderStats.STAGES))
+        self.assertTrue(all(stage_time >= 0 for stage_time in stats.stage_times.values()))
+        # A callback is given the stats of each table, and collect_stats adds up every table drawn in its block
+        called = []
+        with latextable.collect_stats() as collected:
+            for _ in range(3):
+                latextable.draw_latex(rows, stats=called.append, **options)
+            "".join(latextable.iter_latex(rows, use_longtable=True))
+        self.assertEqual(len(called), 3)
+        self.assertEqual(called[0].cells, 4)
+        self.assertEqual(collected.calls, 4)
+        self.assertEqual(collected.cells, 3 * 4 + 9)
+        self.assertEqual(collected.alias_replacements, 3 * 3)
+        latextable.draw_latex(rows)
+        self.assertEqual(collected.calls, 4)
+
+    def test_draw_latex_does_not_modify_table(self):
+        table = texttable.Texttable()
+        table.add_rows([["A", "B & C"], ["a1 & b1", "c1"], ["a2", "b2 & c2"]])
+        original = copy.deepcopy(table.__dict__)
+        first = latextable.draw_latex(table, alias={'&': '\\&'})
+        second = latextable.draw_latex(table, alias={'&': 'and'})
+        self.assertEqual(table.__dict__, original)
+        self.assertFalse(hasattr(table, "_align"))
+        self.assertIn("a1 \\& b1", first)
+        self.assertIn("a1 and b1", second)
+        # The alias is applied to the header after dropping columns, so columns are dropped by their original name
+        dropped = latextable.draw_latex(table, drop_columns=["B & C"], alias={'&': '\\&'})
+        self.assertNotIn("B \\& C", dropped)
+
+    def test_draw_latex_threads(self):
+        table = texttable.Texttable()
+        table.add_rows([["A", "B"]] + [["a{:d} +-".format(i), "b{:d}".format(i)] for i in range(200)])
+        aliases = [{'+-': '$\\pm$'}, {'+-': 'pm'}, None, {'a': 'A'}]
+        expected = [latextable.draw_latex(copy.deepcopy(table), alias=alias) for alias in aliases]
+        results = {}
+
+        def render(thread_idx):
+            for _ in range(20):
+                out = latextable.draw_latex(table, alias=aliases[thread_idx % len(aliases)])
+                if out != expected[thread_idx % len(aliases)]:
+                    results[thread_idx] = out
+                    return
+            results.setdefault(thread_idx, None)
+
+        threads = [threading.Thread(target=render, args=(i,)) for i in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, {i: None for i in range(16)})
+
+    def test_latex_table(self):
+        table = latextable.LatexTable(["Name", "Age", "Score"], [["A", 32, 1.23456], ["B", "07", 5e10]],
+                                      align=["l", "r", "c"], deco=latextable.LatexTable.HEADER)
+        self.assertEqual(table.n_rows, 2)
+        self.assertEqual(table.n_columns, 3)
+        # Strings that are numbers are formatted too, as Texttable does, unless auto formatting is turned off
+        self.assertEqual(table.columns[1], ("32", "7"))
+        self.assertEqual(list(table.rows()), [("A", "32", "1.235"), ("B", "7", "5.000e+10")])
+        self.assertTrue(table.has_header())
+        self.assertFalse(table.has_border())
+        verbatim = latextable.LatexTable.from_rows([["Age", "Score"], ["07", "1.23456"], [7, 1.5]], auto_format=False)
+        self.assertEqual(list(verbatim.rows()), [("07", "1.23456"), ("7", "1.5")])
+        self.assertRaises(latextable.RowSizeError, latextable.LatexTable, ["A", "B"], [["a1"]])
+        # Column alignments must match the header
+        self.assertRaises(latextable.AlignError, latextable.LatexTable, ["A", "B"], align="lrc")
+        self.assertRaises(latextable.AlignError, latextable.LatexTable.from_columns, ["A", "B"], [(), ()], align="lx")
+        self.assertRaises(latextable.AlignError, latextable.TableStream, ["A", "B"], iter([]), align=["l"])
+
+    def test_latex_table_matches_texttable(self):
+        rows = [["Name", "Age", "Nickname"],
+                ["Mr\nXavier\nHuon", 32, "Xav'"],
+                ["Mr\nBaptiste\nClement", 1.5, "Baby"]]
+        table = texttable.Texttable()
+        table.set_deco(texttable.Texttable.BORDER | texttable.Texttable.VLINES)
+        table.set_cols_align(["l", "r", "c"])
+        table.add_rows(rows)
+        expected = latextable.draw_latex(table, caption="Caption")
+        native = latextable.LatexTable.from_rows(rows, align=["l", "r", "c"],
+                                                 deco=latextable.LatexTable.BORDER | latextable.LatexTable.VLINES)
+        self.assertEqual(latextable.draw_latex(native, caption="Caption"), expected)
+        self.assertEqual(latextable.draw_latex(latextable.LatexTable.from_texttable(table), caption="Caption"),
+                         expected)
+        # A Texttable without a header is drawn with an empty header row
+        table = texttable.Texttable()
+        table.add_rows(rows, header=False)
+        self.assertEqual(latextable.draw_latex(table), latextable.draw_latex([["", "", ""]] + rows))
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_latex_table_from_array(self):
+        array = numpy.array([[1.23456, 1234567, 0.5], [2.5, 3, float("nan")]])
+        table = latextable.LatexTable.from_array(array, header=["A", "B", "C"], precision={"A": 2}, scientific={"C": True},
+                                                 thousands={"B": True})
+        self.assertEqual(table.header, ["A", "B", "C"])
+        self.assertEqual(list(table.rows()), [("1.23", "1,234,567.000", "5.000e-01"), ("2.50", "3.000", "nan")])
+        table = latextable.LatexTable.from_array(numpy.array([[1, 2000], [3, 4]]), thousands=True)
+        self.assertEqual(table.header, ["0", "1"])
+        self.assertEqual(list(table.rows()), [("1", "2,000"), ("3", "4")])
+        self.assertRaises(ValueError, latextable.LatexTable.from_array, numpy.zeros(3))
+        # An array passed to draw_latex is treated like a list of rows
+        rows = [["A", "B"], ["a1", "b1"]]
+        self.assertEqual(latextable.draw_latex(numpy.array(rows)), latextable.draw_latex(rows))
+
+    @unittest.skipIf(pandas is None, "pandas is not installed")
+    def test_latex_table_from_dataframe(self):
+        df = pandas.DataFrame({"Name": ["a", "b"], "Score": [0.12345, 10.0], "Count": [10, 20000]},
+                              index=pandas.Index(["r1", "r2"], name="Run"))
+        table = latextable.LatexTable.from_dataframe(df, index=True, precision=1, thousands={"Count": True})
+        self.assertEqual(table.header, ["Run", "Name", "Score", "Count"])
+        self.assertEqual(list(table.rows()), [("r1", "a", "0.1", "10"), ("r2", "b", "10.0", "20,000")])
+        self.assertIn("a & 0.123 & 10 \\\\", latextable.draw_latex(df))
+        # Nullable columns keep their type, and missing values are empty
+        df = pandas.DataFrame({"Count": pandas.array([1, None, 20000], dtype="Int64"),
+                               "Flag": pandas.array([True, None, False], dtype="boolean"),
+                               "Score": pandas.array([0.5, None, 2.0], dtype="Float64")})
+        table = latextable.LatexTable.from_dataframe(df, thousands={"Count": True})
+        self.assertEqual(list(table.rows()), [("1", "True", "0.500"), ("", "", ""), ("20,000", "False", "2.000")])
+
+    def test_latex_template(self):
+        header = ["R", "A", "B", "C"]
+        options = dict(drop_columns=["B"], position="ht", multicolumn_header=[("", 1), ("AC", 2)],
+                       alias={"&": "\\&"})
+        for use_booktabs in [False, True]:
+            for caption_above in [False, True]:
+                template = latextable.LatexTemplate(header, align=["l", "c", "c", "r"], use_booktabs=use_booktabs,
+                                                    caption_above=caption_above, **options)
+                for n_rows in [0, 1, 3]:
+                    rows = [[i, "a & {:d}".format(i), "b", 1.5 * i] for i in range(n_rows)]
+                    expected = latextable.draw_latex(
+                        latextable.LatexTable(header, rows, align=["l", "c", "c", "r"]), caption="Run {:d}".format(n_rows),
+                        label="table:{:d}".format(n_rows), caption_above=caption_above, use_booktabs=use_booktabs,
+                        **options)
+                    self.assertEqual(template.render(rows, caption="Run {:d}".format(n_rows),
+                                                     label="table:{:d}".format(n_rows)), expected)
+        # Rows must have one cell per column of the header, even if some columns are dropped
+        self.assertRaises(latextable.RowSizeError, template.render, [[0, "a", 1.5]])
+        self.assertRaises(latextable.RowSizeError, template.render, [[0, "a", "b", 1.5, "extra"]])
+
+    def test_draw_latex_many(self):
+        tables = [[["A", "B"]] + [["a{:d}".format(i), "b{:d}".format(j)] for j in range(i + 1)] for i in range(6)]
+        texttable_table = texttable.Texttable()
+        texttable_table.add_rows(tables[0])
+        tables.append(texttable_table)
+        options = [{"caption": "Table {:d}".format(i), "drop_columns": ["B"]} for i in range(len(tables))]
+        expected = [latextable.draw_latex(t, **o) for t, o in zip(tables, options)]
+        self.assertEqual(latextable.draw_latex_many(tables, options, workers=1), expected)
+        self.assertEqual(latextable.draw_latex_many(tables, options, workers=2, chunksize=2), expected)
+        # A single dict of options is used for every table
+        plan = latextable.RenderPlan(["A", "B"], drop_columns=["A"])
+        self.assertEqual(pickle.loads(pickle.dumps(plan)).columns, plan.columns)
+        self.assertEqual(latextable.draw_latex_many(tables, {"plan": plan}, workers=2),
+                         [latextable.draw_latex(t, plan=plan) for t in tables])
+        # Write to files
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = [os.path.join(tmp_dir, "table_{:d}.tex".format(i)) for i in range(len(tables))]
+            self.assertEqual(latextable.draw_latex_many(tables, options, workers=2, paths=paths), paths)
+            for path, out in zip(paths, expected):
+                with open(path) as fp:
+                    self.assertEqual(fp.read(), out)
+        self.assertRaises(ValueError, latextable.draw_latex_many, tables, options[:2])
+
+    def test_draw_latex_workers(self):
+        rows = [["A", "B", "C"]] + [["a{:d} & x".format(i), "b{:d}".format(i), "c{:d}".format(i)] for i in range(50)]
+        for options in [{}, {"drop_rows": [49]}, {"drop_rows": [0, 10, 20]}, {"use_booktabs": True},
+                        {"alias": {"&": "\\&"}, "drop_columns": ["B"]}]:
+            expected = latextable.draw_latex(rows, **options)
+            self.assertEqual(latextable.draw_latex(rows, workers=3, **options), expected)
+        self.assertEqual(latextable.draw_latex(rows[:1], workers=2), latextable.draw_latex(rows[:1]))
+        apply_alias = latextable._compile_alias((("&", "\\&"),))
+        self.assertEqual(pickle.loads(pickle.dumps(apply_alias))("a & b"), "a \\& b")
+
+    def test_longtable(self):
+        rows = [["A", "B"]] + [["a{:d}".format(i), "b{:d}".format(i)] for i in range(3)]
+        out = latextable.draw_latex(rows, use_longtable=True, caption="Caption", label="table:test", caption_above=True,
+                                    position="ht")
+        self.assertTrue(out.startswith("\\begin{longtable}{|l|l|}\n\t\\caption{Caption}\\label{table:test} \\\\\n"))
+        self.assertTrue(out.endswith("\ta2 & b2 \\\\\n\\end{longtable}"))
+        self.assertEqual(out.count("\tA & B \\\\\n"), 2)
+        self.assertIn("\\caption[]{Caption (continued)} \\\\\n", out)
+        self.assertNotIn("[ht]", out)
+        for marker in ["\\endfirsthead", "\\endhead", "\\endfoot", "\\endlastfoot"]:
+            self.assertEqual(out.count(marker), 1)
+        # Caption below the table goes in the last footer, after the bottom rule
+        out = latextable.draw_latex(rows, use_longtable=True, use_booktabs=True, caption="Caption")
+        self.assertIn("\t\\bottomrule\n\t\\caption{Caption} \\\\\n\t\\endlastfoot\n", out)
+        self.assertNotIn("\\endfirsthead", out)
+        # A label without a caption goes at the end of the first header row, rather than in an empty row
+        out = latextable.draw_latex(rows, use_longtable=True, label="table:test")
+        self.assertTrue(out.startswith("\\begin{longtable}{|l|l|}\n\t\\hline\n\tA & B\\label{table:test} \\\\\n"
+                                       "\t\\hline\n\t\\endfirsthead\n\t\\hline\n\tA & B \\\\\n"))
+
+    def test_split_rows(self):
+        rows = [["A", "B"]] + [["a{:d}".format(i), "b{:d}".format(i)] for i in range(5)]
+        out = latextable.draw_latex(rows, split_rows=2, caption="Caption", label="table:test")
+        self.assertEqual(out.count("\\begin{table}"), 3)
+        self.assertEqual(out.count("\tA & B \\\\\n"), 3)
+        self.assertEqual(out.count("\\caption{Caption (continued)}"), 2)
+        self.assertEqual(out.count("\\label{table:test}"), 1)
+        self.assertTrue(out.endswith("\\end{table}"))
+        # Each table is drawn as a normal table
+        first = out[:out.index("\\end{table}") + len("\\end{table}")]
+        self.assertEqual(first, latextable.draw_latex(rows[:3], caption="Caption", label="table:test"))
+        self.assertEqual(latextable.draw_latex(rows, split_rows=10), latextable.draw_latex(rows))
+        self.assertRaises(ValueError, latextable.draw_latex, rows, split_rows=0)
+
+    def test_incremental_renderer(self):
+        table = texttable.Texttable()
+        table.add_rows([["A", "B"], ["a0", "b0 & c"], ["a1", "b1"], ["a2", "b2"]])
+        options = dict(alias={"&": "\\&"}, use_booktabs=False, drop_columns=["A"])
+        renderer = latextable.IncrementalRenderer(**options)
+        self.assertEqual(renderer.render(table, caption="Caption"),
+                         latextable.draw_latex(table, caption="Caption", **options))
+        self.assertEqual(renderer.rows_drawn, 3)
+        # Only new or changed rows are drawn again
+        table.add_rows([["a3", "b3"], ["a4", "b4"]], header=False)
+        table._rows[0] = ["a0", "changed"]
+        self.assertEqual(renderer.render(table, label="table:test"),
+                         latextable.draw_latex(table, label="table:test", **options))
+        self.assertEqual(renderer.rows_drawn, 6)
+        self.assertEqual(renderer.render(table), latextable.draw_latex(table, **options))
+        self.assertEqual(renderer.rows_drawn, 6)
+        # Changing the layout clears the cache
+        table.set_deco(texttable.Texttable.HEADER)
+        self.assertEqual(renderer.render(table), latextable.draw_latex(table, **options))
+        self.assertEqual(renderer.rows_drawn, 11)
+
+    def test_render_cache(self):
+        cache = latextable.RenderCache(maxsize=2)
+        rows = [["A", "B"], ["a1", "b1 & c"]]
+        out = cache.draw_latex(rows, alias={"&": "\\&"}, caption="Caption")
+        self.assertEqual(out, latextable.draw_latex(rows, alias={"&": "\\&"}, caption="Caption"))
+        self.assertIs(cache.draw_latex(rows, caption="Caption", alias={"&": "\\&"}), out)
+        self.assertEqual(cache.cache_info()[:4], (1, 1, 0, 1))
+        # Any change to the table or the options is a miss
+        cache.draw_latex(rows, alias={"&": "and"}, caption="Caption")
+        cache.draw_latex([["A", "B"], ["a1", "b1 & d"]], alias={"&": "\\&"}, caption="Caption")
+        self.assertEqual(cache.cache_info()[:4], (1, 3, 1, 2))
+        cache.draw_latex(rows, alias={"&": "\\&"}, caption="Caption")
+        self.assertEqual(cache.cache_info()[:4], (1, 4, 2, 2))
+        # Limit by size
+        cache = latextable.RenderCache(maxbytes=len(out) * 2)
+        for i in range(5):
+            cache.draw_latex(rows, caption="Caption {:d}".format(i))
+        info = cache.cache_info()
+        self.assertLessEqual(info.bytes, len(out) * 2)
+        self.assertEqual(info.evictions, 5 - info.size)
+        cache.clear()
+        self.assertEqual(cache.cache_info(), (0, 0, 0, 0, 0))
+        # Functions are only identified by their address, which may be reused, so they bypass the cache
+        for threshold in range(3):
+            self.assertEqual(cache.draw_latex(rows * 3, rows=lambda row, t=threshold: row[0] < "a{:d}".format(t)),
+                             latextable.draw_latex(rows * 3, rows=lambda row, t=threshold: row[0] < "a{:d}".format(t)))
+        plan = latextable.RenderPlan(rows[0], rows=lambda row: True)
+        cache.draw_latex(rows, plan=plan)
+        self.assertEqual(cache.cache_info(), (0, 0, 0, 0, 0))
+        # Streams are only read as they are drawn, so they bypass the cache
+        self.assertEqual(cache.draw_latex(latextable.TableStream.from_rows(iter(rows))), latextable.draw_latex(rows))
+        self.assertEqual(cache.cache_info(), (0, 0, 0, 0, 0))
+
+    @unittest.skipIf(pandas is None, "pandas is not installed")
+    def test_render_cache_long_masks(self):
+        # The repr of a long Series is abbreviated, so masks that only differ in the middle have the same repr
+        rows = [["A"]] + [["a{:d}".format(i)] for i in range(100)]
+        masks = [pandas.Series([i != skip for i in range(100)]) for skip in (40, 60)]
+        self.assertEqual(repr(masks[0]), repr(masks[1]))
+        expected = [latextable.draw_latex(rows, rows=mask) for mask in masks]
+        self.assertNotEqual(expected[0], expected[1])
+        cache = latextable.RenderCache()
+        self.assertEqual([cache.draw_latex(rows, rows=mask) for mask in masks], expected)
+        self.assertEqual(cache.cache_info()[:2], (0, 2))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "table.tex")
+            for mask, out in zip(masks, expected):
+                latextable.render_to_file(rows, path, cache_dir=os.path.join(tmp_dir, "cache"), rows=mask)
+                with open(path) as fp:
+                    self.assertEqual(fp.read(), out)
+
+    def test_render_to_file(self):
+        rows = [["A", "B"], ["a1", "b1"]]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "table.tex")
+            cache_dir = os.path.join(tmp_dir, "cache")
+            self.assertTrue(latextable.render_to_file(rows, path, cache_dir=cache_dir, caption="Caption"))
+            with open(path) as fp:
+                self.assertEqual(fp.read(), latextable.draw_latex(rows, caption="Caption"))
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            # Unchanged output is not written again
+            os.utime(path, (0, 0))
+            self.assertFalse(latextable.render_to_file(rows, path, cache_dir=cache_dir, caption="Caption"))
+            self.assertFalse(latextable.render_to_file(rows, path, caption="Caption"))
+            self.assertEqual(os.path.getmtime(path), 0)
+            # Changed output is written
+            self.assertTrue(latextable.render_to_file(rows, path, cache_dir=cache_dir, caption="New caption"))
+            with open(path) as fp:
+                self.assertEqual(fp.read(), latextable.draw_latex(rows, caption="New caption"))
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+            self.assertEqual(sorted(os.listdir(tmp_dir)), ["cache", "table.tex"])
+            # Cached outputs are used instead of drawing the table
+            for name in os.listdir(cache_dir):
+                with open(os.path.join(cache_dir, name), "w") as fp:
+                    fp.write("cached")
+            self.assertTrue(latextable.render_to_file(rows, path, cache_dir=cache_dir, caption="Caption"))
+            with open(path) as fp:
+                self.assertEqual(fp.read(), "cached")
+            self.assertTrue(latextable.render_to_file(rows, path, cache_dir=cache_dir, rows=lambda row: True))
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+            stream = latextable.TableStream.from_rows(iter(rows))
+            self.assertFalse(latextable.render_to_file(stream, path, cache_dir=cache_dir))
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+            # New files get the default permissions, and replaced files keep theirs
+            umask = os.umask(0o022)
+            try:
+                new_path = os.path.join(tmp_dir, "new.tex")
+                latextable.render_to_file(rows, new_path)
+                self.assertEqual(stat.S_IMODE(os.stat(new_path).st_mode), 0o644)
+                os.chmod(path, 0o640)
+                latextable.render_to_file(rows, path, caption="Caption")
+                self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o640)
+            finally:
+                os.umask(umask)
+
+    def test_table_stream(self):
+        rows = [["A", "B"], ["a1", 1], ["a2", 2.5], ["a3", "b3"]]
+        for options in [{}, {"drop_rows": [1]}, {"drop_columns": ["B"], "use_booktabs": True},
+                        {"use_longtable": True}, {"split_rows": 2}]:
+            stream = latextable.TableStream.from_rows(iter(rows))
+            self.assertIsNone(stream.n_rows)
+            self.assertEqual(latextable.draw_latex(stream, **options), latextable.draw_latex(rows, **options))
+            self.assertEqual(stream.n_rows, 3)
+        # Dropped rows beyond the end are only found once the stream has been read
+        with self.assertRaises(latextable.DropRowError):
+            latextable.draw_latex(latextable.TableStream.from_rows(iter(rows)), drop_rows=[3])
+
+    def test_merge_repeated(self):
+        rows = [["Model", "Data", "Acc"], ["A", "x", "0.900"], ["A", "x", "0.800"], ["A", "y", "0.700"],
+                ["B", "y", "0.600"]]
+        expected = ("\\begin{table}\n"
+                    "\t\\begin{center}\n"
+                    "\t\t\\begin{tabular}{|l|l|l|}\n"
+                    "\t\t\t\\hline\n"
+                    "\t\t\tModel & Data & Acc \\\\\n"
+                    "\t\t\t\\hline\n"
+                    "\t\t\t &  & 0.900 \\\\\n"
+                    "\t\t\t\\cline{3-3}\n"
+                    "\t\t\t & \\multirow{-2}{*}{x} & 0.800 \\\\\n"
+                    "\t\t\t\\cline{2-3}\n"
+                    "\t\t\t\\multirow{-3}{*}{A} & y & 0.700 \\\\\n"
+                    "\t\t\t\\hline\n"
+                    "\t\t\tB & y & 0.600 \\\\\n"
+                    "\t\t\t\\hline\n"
+                    "\t\t\\end{tabular}\n"
+                    "\t\\end{center}\n"
+                    "\\end{table}")
+        self.assertEqual(latextable.draw_latex(rows, merge_repeated=["Model", "data"]), expected)
+        # Runs in a column are not broken by columns to its right, or by columns that are not merged
+        booktabs = latextable.draw_latex(rows, merge_repeated=["Data"], use_booktabs=True)
+        self.assertIn("A & \\multirow{-2}{*}{x} & 0.800", booktabs)
+        self.assertIn("B & \\multirow{-2}{*}{y} & 0.600", booktabs)
+        self.assertNotIn("cline", booktabs)
+        # Streams are merged with one row of lookahead
+        stream = latextable.TableStream(rows[0], iter(rows[1:]))
+        self.assertEqual(latextable.draw_latex(stream, merge_repeated=["Model", "Data"]), expected)
+        # Merging applies to the drawn rows, and runs do not cross split tables
+        self.assertIn("\\multirow{-2}{*}{A} & y", latextable.draw_latex(rows, merge_repeated=["Model"], drop_rows=[0]))
+        split = latextable.draw_latex(rows, merge_repeated=["Model"], split_rows=2)
+        self.assertEqual(split.count("\\multirow{-2}{*}{A}"), 1)
+        self.assertIn("\t\t\tA & y & 0.700", split)
+        self.assertNotIn("multirow", latextable.draw_latex(rows, merge_repeated=["Model"], drop_columns=["Model"]))
+        self.assertRaises(latextable.MergeColumnError, latextable.draw_latex, rows, merge_repeated=["Seed"])
+
+    def test_summary(self):
+        rows = [["Run", "Score"]] + [[str(i), "{:,}".format(i * 37 % 101 * 100)] for i in range(20)]
+        self.assertEqual(latextable.draw_latex(rows, summary=("headtail", 2)),
+                         latextable.draw_latex(rows[:3] + [["$\\vdots$", "$\\vdots$"]] + rows[-2:]))
+        # The separator is only drawn if rows are left out
+        self.assertEqual(latextable.draw_latex(rows[:5], summary=("headtail", 2)), latextable.draw_latex(rows[:5]))
+        self.assertEqual(latextable.draw_latex(rows, summary=("topk", "score", 3)),
+                         latextable.draw_latex([rows[0], rows[20], rows[9], rows[17]]))
+        # Cells that are not numbers are ranked last, and ties are kept in table order
+        ranked = [["A", "B"], ["x", "n/a"], ["y", "2"], ["z", "2"], ["w", "nan"], ["v", "1"]]
+        self.assertEqual(latextable.draw_latex(ranked, summary=("topk", "B", 4)),
+                         latextable.draw_latex([ranked[0], ranked[2], ranked[3], ranked[5], ranked[1]]))
+        # Summaries are taken from the selected rows, and streamed
+        stream = latextable.TableStream(rows[0], iter(rows[1:]))
+        self.assertEqual(latextable.draw_latex(stream, summary=("headtail", 1), drop_rows=[0], drop_columns=["Run"]),
+                         latextable.draw_latex([rows[0], rows[2], ["", "$\\vdots$"], rows[-1]], drop_columns=["Run"]))
+        stats = latextable.RenderStats()
+        latextable.draw_latex(rows, summary=("headtail", 2), stats=stats)
+        self.assertEqual((stats.cells, stats.rows_dropped), (8, 16))
+        for summary in [("headtail", 0), ("tail", 2), ("topk", "Seed", 2)]:
+            self.assertRaises(latextable.SummaryError, latextable.draw_latex, rows, summary=summary)
+        self.assertRaises(latextable.SummaryError, latextable.draw_latex, rows, summary=("topk", "Run", 2),
+                          drop_columns=["Run"])
+        self.assertRaises(latextable.SummaryError, latextable.draw_latex, rows, summary=("headtail", 2), split_rows=5)
+
+    def test_highlight(self):
+        rows = [["Model", "Acc", "Loss"], ["a", "0.9", "0.3"], ["b", "0.95", "0.1"], ["c", "0.950", "n/a"],
+                ["d", "0.8", "0.2"]]
+        expected = [["Model", "Acc", "Loss"],
+                    ["a", "\\underline{0.900}", "0.300"],
+                    ["b", "\\textbf{0.950}", "\\textbf{0.100}"],
+                    ["c", "\\textbf{0.950}", "n/a"],
+                    ["d", "0.800", "\\underline{0.200}"]]
+        self.assertEqual(latextable.draw_latex(rows, highlight={"acc": "max", "Loss": "min"}),
+                         latextable.draw_latex(expected))
+        # Highlighting is applied after escaping, and the best values are found among the drawn rows only
+        dropped = latextable.draw_latex(rows, highlight={"Acc": "max"}, drop_rows=[1, 2], escape=True)
+        self.assertIn("a & \\textbf{0.900} & 0.300 \\\\", dropped)
+        self.assertIn("d & \\underline{0.800} & 0.200 \\\\", dropped)
+        self.assertIn("c & \\textbf{0.950} \\\\",
+                      latextable.draw_latex(rows, highlight={"Acc": "max"}, rows=lambda row: row[0] != "b",
+                                            drop_columns=["Loss"]))
+        # Streams are read into memory, and worker processes highlight the same cells
+        stream = latextable.TableStream(rows[0], iter(rows[1:]))
+        self.assertEqual(latextable.draw_latex(stream, highlight={"Acc": "max", "Loss": "min"}),
+                         latextable.draw_latex(expected))
+        self.assertEqual(latextable.draw_latex(rows, highlight={"Acc": "max", "Loss": "min"}, workers=2),
+                         latextable.draw_latex(expected))
+
+        async def read_rows():
+            for row in rows:
+                yield row
+
+        self.assertEqual(asyncio.run(latextable.adraw_latex(read_rows(), highlight={"Acc": "max", "Loss": "min"})),
+                         latextable.draw_latex(expected))
+        self.assertNotIn("textbf", latextable.draw_latex(rows, highlight={"Acc": "max"}, drop_columns=["Acc"]))
+        self.assertRaises(latextable.HighlightColumnError, latextable.draw_latex, rows, highlight={"F1": "max"})
+        self.assertRaises(ValueError, latextable.draw_latex, rows, highlight={"Acc": "best"})
+
+    def test_draw_formats(self):
+        table = texttable.Texttable()
+        table.set_cols_align(["l", "r", "c"])
+        table.add_rows([["Name", "Age", "Nickname"], ["Xav | ier", 32, "Xav'"], ["Baptiste <b>", 1.5, "B&B"]])
+        out = latextable.draw_formats(table, caption="A & B", alias={"&": "\\&"})
+        self.assertEqual(out["latex"], latextable.draw_latex(table, caption="A & B", alias={"&": "\\&"}))
+        self.assertEqual(out["text"], table.draw())
+        self.assertEqual(out["markdown"], "| Name | Age | Nickname |\n"
+                                          "| :--- | ---: | :---: |\n"
+                                          "| Xav \\| ier | 32 | Xav' |\n"
+                                          "| Baptiste <b> | 1.500 | B&B |")
+        self.assertEqual(out["html"], "<table>\n"
+                                      "  <caption>A &amp; B</caption>\n"
+                                      "  <thead>\n"
+                                      '    <tr><th>Name</th><th style="text-align: right">Age</th>'
+                                      '<th style="text-align: center">Nickname</th></tr>\n'
+                                      "  </thead>\n"
+                                      "  <tbody>\n"
+                                      '    <tr><td>Xav | ier</td><td style="text-align: right">32</td>'
+                                      '<td style="text-align: center">Xav&#x27;</td></tr>\n'
+                                      '    <tr><td>Baptiste &lt;b&gt;</td><td style="text-align: right">1.500</td>'
+                                      '<td style="text-align: center">B&amp;B</td></tr>\n'
+                                      "  </tbody>\n"
+                                      "</table>")
+        # Columns and rows are dropped and selected once for every format
+        out = latextable.draw_formats(table, ["markdown", "latex"], drop_columns=["Age"], drop_rows=[0])
+        self.assertEqual(out["markdown"], "| Name | Nickname |\n| :--- | :---: |\n| Baptiste <b> | B&B |")
+        self.assertEqual(out["latex"], latextable.draw_latex(table, drop_columns=["Age"], drop_rows=[0]))
+        stream = latextable.TableStream(["A", "B"], iter([["1", "2"], ["3", "4"]]))
+        files = {"markdown": io.StringIO()}
+        latextable.write_formats(stream, files, rows=[1])
+        self.assertEqual(files["markdown"].getvalue(), "| A | B |\n| :--- | :--- |\n| 3 | 4 |")
+        self.assertRaises(ValueError, latextable.draw_formats, table, ["pdf"])
+        # Cells with newlines are cleaned for Latex as by draw_latex, with or without aliases
+        rows = [["A_1", "B"], ["x\n_y", "a\nb & {c}"]]
+        for options in [dict(escape=True), dict(escape=True, alias={"a\nb": "ab", "&": "and"}),
+                        dict(escape=True, raw_columns=["B"], highlight={"B": "max"}, stats=latextable.RenderStats())]:
+            out = latextable.draw_formats(rows, ["latex", "markdown"], **options)
+            self.assertEqual(out["latex"], latextable.draw_latex(rows, **options))
+            self.assertEqual(out["markdown"], "| A_1 | B |\n| :--- | :--- |\n| x_y | ab & {c} |")
+        # Text cells are wrapped to the table's max width, as by Texttable
+        wide = texttable.Texttable(max_width=30)
+        wide.set_deco(texttable.Texttable.HEADER | texttable.Texttable.VLINES)
+        wide.add_rows([["Name", "Description"], ["Xavier", "A rather long description to wrap"], ["日本語", "short"]])
+        self.assertEqual(latextable.draw_formats(wide, ["text"])["text"], wide.draw())
+
+    def test_main(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = os.path.join(tmp_dir, "table.csv")
+            jsonl_path = os.path.join(tmp_dir, "table.jsonl")
+            out_path = os.path.join(tmp_dir, "table.tex")
+            with open(csv_path, "w", newline="") as fp:
+                fp.write('Name,Score\r\nx_1,"1,5"\r\ny,2\r\n')
+            with open(jsonl_path, "w") as fp:
+                fp.write('{"Name": "x_1", "Score": "1,5"}\n\n{"Name": "y", "Score": 2}\n')
+            expected = latextable.draw_latex([["Name", "Score"], ["x_1", "1,5"], ["y", "2"]], caption="Scores",
+                                             escape=True, use_booktabs=True) + "\n"
+            for path in [csv_path, jsonl_path]:
+                stderr = io.StringIO()
+                with contextlib.redirect_stderr(stderr):
+                    status = latextable.main([path, "-o", out_path, "--caption", "Scores", "--escape", "--booktabs",
+                                              "--progress"])
+                self.assertEqual(status, 0)
+                self.assertIn("2 rows in", stderr.getvalue())
+                with open(out_path) as fp:
+                    self.assertEqual(fp.read(), expected)
+            stderr = io.StringIO()
+            with contextlib.redirect_stderr(stderr):
+                status = latextable.main([csv_path, "-o", out_path, "--drop-column", "Missing"])
+            self.assertEqual(status, 1)
+            self.assertIn("latextable: error: Cannot drop column Missing", stderr.getvalue())
+            stderr = io.StringIO()
+            with contextlib.redirect_stderr(stderr):
+                status = latextable.main([csv_path, "-o", out_path, "--align", "lrc"])
+            self.assertEqual(status, 1)
+            self.assertIn("latextable: error: Got 3 column alignments but the table has 2 columns.", stderr.getvalue())
+            # JSON lines must be arrays or objects
+            for text in ['5\n', '["A"]\n"ab"\n']:
+                with open(jsonl_path, "w") as fp:
+                    fp.write(text)
+                stderr = io.StringIO()
+                with contextlib.redirect_stderr(stderr):
+                    status = latextable.main([jsonl_path, "-o", out_path])
+                self.assertEqual(status, 1)
+                self.assertIn("latextable: error: Line {:d} is not a JSON array or object.".format(text.count("\n")),
+                              stderr.getvalue())
+            # Files that can't be opened are reported as errors
+            for args in [[os.path.join(tmp_dir, "missing.csv")], [csv_path, "-o", os.path.join(tmp_dir, "no", "t.tex")]]:
+                stderr = io.StringIO()
+                with contextlib.redirect_stderr(stderr):
+                    status = latextable.main(args)
+                self.assertEqual(status, 1)
+                self.assertIn("latextable: error: [Errno 2] No such file or directory", stderr.getvalue())
+
+    def test_async(self):
+        rows = [["A", "B"]] + [["a{:d}".format(i), "b_{:d}".format(i)] for i in range(50)]
+
+        async def iter_rows():
+            for row in rows:
+                await asyncio.sleep(0)
+                yield row
+
+        class StreamWriter:
+            def __init__(self):
+                self.data = b""
+                self.drains = 0
+
+            def write(self, data):
+                self.data += data
+
+            async def drain(self):
+                self.drains += 1
+
+        for options in [{}, {"drop_rows": [0, 2], "escape": True}, {"split_rows": 7}, {"use_longtable": True}]:
+            expected = latextable.draw_latex(rows, **options)
+            self.assertEqual(asyncio.run(latextable.adraw_latex(rows, yield_every=3, **options)), expected)
+            self.assertEqual(asyncio.run(latextable.adraw_latex(iter_rows(), yield_every=3, **options)), expected)
+            writer = StreamWriter()
+            asyncio.run(latextable.awrite_latex(iter_rows(), writer, **options))
+            self.assertEqual(writer.data.decode("utf-8"), expected)
+            self.assertEqual(writer.drains, 1)
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_from_arrow(self):
+        table = pyarrow.table({"Count": pyarrow.array([1, None, 3000]), "Mean": [0.5, 2.25, None],
+                               "Name": ["a", None, "c"]})
+        expected = latextable.draw_latex(latextable.LatexTable.from_rows(
+            [["Count", "Mean", "Name"], ["1", "0.50", "a"], ["", "2.25", ""], ["3,000", "", "c"]], auto_format=False))
+        options = dict(precision=2, thousands={"Count": True})
+        self.assertEqual(latextable.draw_latex(latextable.LatexTable.from_arrow(table, **options)), expected)
+        stream = latextable.TableStream.from_arrow(table.to_batches(max_chunksize=1), **options)
+        self.assertEqual(latextable.draw_latex(stream), expected)
+        # Memory-mapped IPC files are drawn one record batch at a time
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "table.arrow")
+            with pyarrow.ipc.new_file(path, table.schema) as writer:
+                for batch in table.to_batches(max_chunksize=2):
+                    writer.write_batch(batch)
+            with pyarrow.memory_map(path) as source:
+                reader = pyarrow.ipc.open_file(source)
+                self.assertEqual(latextable.draw_latex(reader), latextable.draw_latex(table))
+
+    def test_register_adapter(self):
+        class Records:
+            def __init__(self, header, records):
+                self.header = header
+                self.records = records
+
+        class MoreRecords(Records):
+            pass
+
+        adapters = list(latextable._adapters)
+        try:
+            latextable.register_adapter(Records, lambda records: latextable.LatexTable(records.header, records.records))
+            expected = latextable.draw_latex([["A", "B"], ["a1", "b1"]])
+            self.assertEqual(latextable.draw_latex(Records(["A", "B"], [["a1", "b1"]])), expected)
+            self.assertEqual(latextable.draw_latex(MoreRecords(["A", "B"], [["a1", "b1"]])), expected)
+            self.assertIn(MoreRecords, latextable._adapter_cache)
+            # Adapters can be registered by name, and later adapters take priority
+            latextable.register_adapter("collections.OrderedDict",
+                                        lambda columns: latextable.LatexTable.from_columns(list(columns),
+                                                                                           list(columns.values())))
+            columns = collections.OrderedDict([("A", ["a1"]), ("B", ["b1"])])
+            self.assertEqual(latextable.draw_latex(columns), expected)
+            latextable.register_adapter(Records, lambda records: latextable.LatexTable(["C"], [["c1"]]))
+            self.assertEqual(latextable.draw_latex(MoreRecords(["A", "B"], [["a1", "b1"]])),
+                             latextable.draw_latex([["C"], ["c1"]]))
+        finally:
+            latextable._adapters[:] = adapters
+            latextable._adapter_cache.clear()
+
+    def test_import_is_lazy(self):
+        # Optional backends and slow standard library modules are only imported when they are used
+        code = ("import sys, time; start = time.perf_counter(); import latextable; "
+                "print(time.perf_counter() - start); print(' '.join(sys.modules))")
+        result = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(latextable.__file__)),
+                                stdout=subprocess.PIPE, universal_newlines=True, check=True)
+        import_time, modules = result.stdout.splitlines()
+        for module in ["texttable", "numpy", "pandas", "pyarrow", "asyncio", "argparse", "concurrent.futures"]:
+            self.assertNotIn(module, modules.split())
+        self.assertLess(float(import_time), 0.5)
+
+    def test_iter_latex(self):
+        rows = [["A", "B"], ["a1", "b1"], ["a2", "b2"], ["a3", "b3"]]
+        expected = latextable.draw_latex(rows, caption="Caption", drop_rows=[1])
+        pieces = list(latextable.iter_latex(rows, caption="Caption", drop_rows=[1]))
+        self.assertEqual("".join(pieces), expected)
+        # Preamble, header, two rows each followed by an hline, and postamble
+        self.assertEqual(len(pieces), 7)
+        # Inputs are checked before iteration starts
+        self.assertRaises(latextable.DropRowError, latextable.iter_latex, rows, drop_rows=[3])
+
+    def test_write_latex(self):
+        rows = [["A", "B"], ["a1", "b1"], ["a2", "b2"]]
+        fp = io.StringIO()
+        self.assertIsNone(latextable.write_latex(rows, fp, use_booktabs=True, label="table:test"))
+        self.assertEqual(fp.getvalue(), latextable.draw_latex(rows, use_booktabs=True, label="table:test"))
+
 
 if __name__ == '__main__':
     unittest.main()